@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .db_router import primary_reads
+
+
+class TokenCache:
+    """Bounded LRU of validated tokens, each kept until its own deadline."""
+
+    def __init__(self, maxsize):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.maxsize = maxsize
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_tokens = TokenCache(getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10000))
+_users = TokenCache(getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10000))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that verifies each access token once per process and
+    loads only what permission checks need from the database.
+
+    Validated tokens are cached by their SHA-256 for AUTH_TOKEN_CACHE_SECONDS
+    at most, and never past their expiry. The user's ``(id, is_staff,
+    is_active)`` is read from the database and cached per token for
+    AUTH_USER_CACHE_SECONDS, so demoting or deactivating a user takes effect
+    within that window; claims such as ``is_admin`` are never trusted for it.
+    request.user is a User with only those fields loaded; any other field is
+    loaded the first time it is read.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        key = hashlib.sha256(raw_token).hexdigest()
+        validated_token = _tokens.get(key)
+        if validated_token is None:
+            validated_token = self.get_validated_token(raw_token)
+            _tokens.set(key, validated_token, self._expires_at(validated_token, "AUTH_TOKEN_CACHE_SECONDS", 300))
+
+        if api_settings.USER_ID_FIELD != "id" or getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            return self.get_user(validated_token), validated_token
+
+        state = _users.get(key)
+        if state is None:
+            state = self._load_user_state(validated_token)
+            _users.set(key, state, self._expires_at(validated_token, "AUTH_USER_CACHE_SECONDS", 30))
+        return get_user_model().from_db(DEFAULT_DB_ALIAS, ["id", "is_staff", "is_active"], list(state)), validated_token
+
+    def _load_user_state(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        with primary_reads():
+            state = (
+                get_user_model().objects.filter(id=user_id)
+                .values_list("id", "is_staff", "is_active")
+                .first()
+            )
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not state[2]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return state
+
+    def _expires_at(self, validated_token, setting, default):
+        return min(validated_token["exp"], time.time() + getattr(settings, setting, default))
@@ -0,0 +1,140 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from prometheus_client import Counter
+from rest_framework.response import Response
+
+from .db_router import primary_reads
+
+cache_requests = Counter(
+    "api_response_cache_requests_total",
+    "Reads served by the API response cache, by view and result.",
+    ["view", "result"],
+)
+
+
+def record_cache_result(view, hit):
+    cache_requests.labels(view=view, result="hit" if hit else "miss").inc()
+
+
+def _version_key(model):
+    return f"cachever:{model._meta.label_lower}"
+
+
+def _modified_key(model):
+    return f"cachemod:{model._meta.label_lower}"
+
+
+def cache_timeout():
+    """
+    Lifetime of cached responses and of the counters keying them: None with a
+    shared cache, finite with a per-process one (see settings.CACHES).
+    """
+    return getattr(settings, "RESPONSE_CACHE_TIMEOUT", None)
+
+
+def model_versions(*models):
+    """
+    Return the change counters of ``models``. Counters start from the clock
+    so keys built before a cache flush or restart can never be reused.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), cache_timeout())
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def models_last_modified(*models):
+    """Return the time (epoch seconds) of the latest change to any of ``models``."""
+    keys = [_modified_key(model) for model in models]
+    modified = cache.get_many(keys)
+    for key in keys:
+        if key not in modified:
+            # Unknown since the cache was emptied: assume it changed just now.
+            cache.add(key, int(time.time()), cache_timeout())
+            modified[key] = cache.get(key)
+    return max((value for value in modified.values() if value is not None), default=None)
+
+
+def bump_model_versions(*models):
+    now = time.time_ns()
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, now, cache_timeout())
+        cache.set(_modified_key(model), int(time.time()), cache_timeout())
+
+
+class CachedListMixin:
+    """
+    Cache a list view's response until one of ``cache_models`` changes.
+
+    The key includes each model's change counter, which the signals in
+    ``api.signals`` bump on save and delete, so a cached response is never
+    served after a write (in the worker that made it, with a per-process
+    cache) and otherwise lives until evicted or ``cache_timeout()``. Misses
+    are filled from the primary, never from a replica that may lag the
+    counter.
+    """
+
+    cache_models = ()
+    cached_headers = ("Link",)
+
+    def get_response_cache_key(self, request):
+        versions = ".".join(str(version) for version in model_versions(*self.cache_models))
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.items()))
+        kwargs = "&".join(f"{k}={v}" for k, v in sorted(self.kwargs.items()))
+        return f"response:{type(self).__name__}:{versions}:{kwargs}:{params}"
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        record_cache_result(type(self).__name__, cached is not None)
+        if cached is not None:
+            data, headers = cached
+            return Response(data, headers=headers)
+
+        with primary_reads():
+            response = super().list(request, *args, **kwargs)
+        headers = {name: response[name] for name in self.cached_headers if response.has_header(name)}
+        cache.set(key, (response.data, headers), cache_timeout())
+        return response
+
+
+class ConditionalListMixin:
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` on a list view with 304
+    before running its query or serializer.
+
+    The ETag is derived from the change counters of ``validator_models`` and
+    the request path, and Last-Modified from the time of their last change,
+    so validating a poll costs a couple of cache reads.
+    """
+
+    validator_models = ()
+
+    def list(self, request, *args, **kwargs):
+        versions = model_versions(*self.validator_models)
+        raw = f"{type(self).__name__}:{versions}:{request.get_full_path()}"
+        etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+        last_modified = models_last_modified(*self.validator_models)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            # Built from the primary: the ETag promises the current version.
+            with primary_reads():
+                response = super().list(request, *args, **kwargs)
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
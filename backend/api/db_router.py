@@ -0,0 +1,93 @@
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Whether reads in the current context must go to the primary. It defaults to
+# True so management commands, workers and anything outside a request keep
+# reading what they just wrote; ReplicaRoutingMiddleware lifts it for safe
+# requests.
+_read_primary = contextvars.ContextVar("read_primary", default=True)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from the primary inside the block, whatever the request allows.
+
+    For anything cached beyond the current request under the change counters
+    of api.caching: a counter is bumped as soon as the write commits, so a
+    lagging replica read right after would be stored (or validated by an
+    ETag) as the new version.
+    """
+    token = _read_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to ``default``; reads go to a random replica from
+    ``DATABASE_REPLICAS`` when the current request allows it.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_primary.get() or not replicas():
+            return "default"
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        return db not in replicas()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe requests read from replicas, except for clients that wrote
+    within the last ``DB_REPLICA_STICKY_SECONDS``: after a successful write
+    the response sets a cookie that keeps that client's reads on the primary
+    until replication has caught up, so they see their own writes.
+    """
+
+    cookie_name = "db_primary_until"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        read_primary = request.method not in SAFE_METHODS or self._sticky(request)
+        token = _read_primary.set(read_primary)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_primary.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replicas():
+            window = settings.DB_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                self.cookie_name, str(int(time.time() + window)), max_age=window, httponly=True, samesite="Lax"
+            )
+        return response
+
+    def _sticky(self, request):
+        try:
+            return float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
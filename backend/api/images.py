@@ -0,0 +1,105 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Pillow save() format and file extension for each variant format.
+FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+    "avif": ("AVIF", "avif"),
+}
+
+
+def available_formats():
+    Image.init()
+    names = getattr(settings, "IMAGE_VARIANT_FORMATS", ("avif", "webp", "jpeg"))
+    return [name for name in names if FORMATS[name][0] in Image.SAVE]
+
+
+def generate_variants(field_file):
+    """
+    Write resized copies of an uploaded image next to the original, one per
+    configured width (never upscaled) and available format, and return
+    ``{"source": name, "width": w, "formats": {fmt: {width: name}}}``.
+    """
+    storage = field_file.storage
+    stem, _ = os.path.splitext(field_file.name)
+    directory, filename = os.path.split(stem)
+
+    with field_file.open("rb") as f:
+        image = ImageOps.exif_transpose(Image.open(f))
+        image.load()
+
+    widths = [w for w in getattr(settings, "IMAGE_VARIANT_WIDTHS", (320, 640, 1280)) if w < image.width]
+    formats = {}
+    for fmt in available_formats():
+        pil_format, extension = FORMATS[fmt]
+        source = image.convert("RGB") if fmt == "jpeg" and image.mode != "RGB" else image
+        formats[fmt] = {}
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = source.resize((width, height), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, quality=80)
+            name = storage.save(
+                os.path.join(directory, "variants", f"{filename}_{width}.{extension}"),
+                ContentFile(buffer.getvalue()),
+            )
+            formats[fmt][width] = name
+
+    return {"source": field_file.name, "width": image.width, "formats": formats}
+
+
+def variant_names(variants):
+    return [name for names in (variants or {}).get("formats", {}).values() for name in names.values()]
+
+
+def process_image_variants(model, pk):
+    """
+    Generate and store the variants of ``model`` row ``pk``'s image. Blobs
+    are only retained when the stored variants change, so a repeated job for
+    the same image adds no references, and they are discarded when the image
+    was replaced meanwhile.
+    """
+    from .caching import bump_model_versions
+    from .storage import discard, release, retain
+
+    try:
+        instance = model.objects.filter(pk=pk).first()
+        if instance is None or not instance.image:
+            return
+        try:
+            variants = generate_variants(instance.image)
+        except (OSError, Image.DecompressionBombError):
+            logger.warning(f"Could not generate variants for {model.__name__} {pk}", exc_info=True)
+            return
+        names = variant_names(variants)
+        with transaction.atomic():
+            stored = (
+                model.objects.select_for_update()
+                .filter(pk=pk, image=variants["source"])
+                .values_list("variants", flat=True)
+                .first()
+            )
+            if stored is None:
+                # The image changed (or the row went) while we worked.
+                discard(names)
+                return
+            if stored.get("source") == variants["source"] and set(variant_names(stored)) == set(names):
+                return
+            # update() rather than save() so the post_save signal doesn't fire again.
+            model.objects.filter(pk=pk).update(variants=variants)
+            retain(names)
+            release(variant_names(stored))
+        bump_model_versions(model)
+        logger.info(f"Image variants generated for {model.__name__} {pk}")
+    finally:
+        close_old_connections()
+
@@ -0,0 +1,44 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database latency when every request opens a new "
+        "connection versus reusing a persistent one (CONN_MAX_AGE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        health_checks = connection.settings_dict.get("CONN_HEALTH_CHECKS", False)
+        self.stdout.write(f"{connection.vendor} database {connection.settings_dict['NAME']}")
+
+        for name, reconnect in (("reconnect per request", True), ("persistent connection", False)):
+            connection.close()
+            timings = []
+            for _ in range(options["requests"]):
+                started = time.perf_counter()
+                # What a request pays before its first real query: a new
+                # connection, or the health check on a reused one.
+                if reconnect:
+                    connection.close()
+                elif connection.connection is not None and health_checks:
+                    connection.is_usable()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                timings.append(time.perf_counter() - started)
+
+            timings.sort()
+            self.stdout.write(
+                f"{name:>22}: median {statistics.median(timings) * 1000:.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.2f} ms"
+            )
+        connection.close()
@@ -0,0 +1,45 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.authentication import CachedJWTAuthentication, _tokens, _users
+from api.serializers import MyTokenObtainPairSerializer
+
+USERNAME = "jwt-benchmark"
+
+
+class Command(BaseCommand):
+    help = "Compare the per-request cost of JWTAuthentication and CachedJWTAuthentication."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=USERNAME)
+        token = str(MyTokenObtainPairSerializer.get_token(user).access_token)
+        request = APIRequestFactory().get("/api/runners/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        _tokens.clear()
+        _users.clear()
+
+        try:
+            for name, authenticator in (
+                ("JWTAuthentication", JWTAuthentication()),
+                ("CachedJWTAuthentication", CachedJWTAuthentication()),
+            ):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(options["requests"]):
+                        authenticator.authenticate(Request(request))
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:>24}: {elapsed / options['requests'] * 1e6:7.1f} µs/request, "
+                    f"{len(queries) / options['requests']:.2f} queries/request"
+                )
+        finally:
+            User.objects.filter(username=USERNAME).delete()
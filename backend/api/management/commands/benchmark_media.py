@@ -0,0 +1,61 @@
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.views.static import serve
+
+from api.views import serve_media
+
+DIRECTORY = "benchmark-media"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serve_media with django.views.static.serve on a full "
+        "download, a conditional revalidation and a 1 MB range request. "
+        "Writes (and afterwards deletes) a test file under MEDIA_ROOT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=20, help="File size in MB.")
+        parser.add_argument("--requests", type=int, default=50)
+
+    def handle(self, *args, **options):
+        size, count = options["size"] * 1024 * 1024, options["requests"]
+        directory = os.path.join(settings.MEDIA_ROOT, DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        path = f"{DIRECTORY}/file.bin"
+        with open(os.path.join(settings.MEDIA_ROOT, path), "wb") as f:
+            f.write(os.urandom(size))
+
+        factory = RequestFactory()
+        views = {
+            "serve_media": lambda request: serve_media(request, path),
+            "static.serve": lambda request: serve(request, path, document_root=settings.MEDIA_ROOT),
+        }
+        try:
+            for name, view in views.items():
+                first = view(factory.get("/"))
+                first.close()
+                cases = [
+                    ("full", {}),
+                    ("revalidation", {"HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]}),
+                    ("1 MB range", {"HTTP_RANGE": f"bytes={size // 2}-{size // 2 + 1024 * 1024 - 1}"}),
+                ]
+                for case, headers in cases:
+                    sent = 0
+                    started = time.perf_counter()
+                    for _ in range(count):
+                        response = view(factory.get("/", **headers))
+                        sent += sum(len(chunk) for chunk in response)
+                        response.close()
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{name:>12} {case:>13}: {response.status_code}, {count / elapsed:8.1f} requests/s, "
+                        f"{sent / elapsed / 1024 / 1024:8.1f} MB/s, {sent / count / 1024:9.1f} KB/request"
+                    )
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,59 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.mileage import AGE_GROUPS, INJURY_CHOICES, plan_batches, plan_for, schedule_for
+
+
+class Command(BaseCommand):
+    help = "Compare planning athletes one at a time with the batched NumPy engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--athletes", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        athletes = [
+            {
+                "age": rng.choice(AGE_GROUPS),
+                "injury": rng.choice(INJURY_CHOICES),
+                "desiredMileage": rng.randint(10, 120),
+            }
+            for _ in range(options["athletes"])
+        ]
+
+        def per_athlete():
+            plans = []
+            for athlete in athletes:
+                start, jump, weeks, desired = plan_for(athlete["age"], athlete["injury"], athlete["desiredMileage"])
+                plans.append({
+                    "start_mileage": start,
+                    "jump": jump,
+                    "weeks": weeks,
+                    "desired_mileage": desired,
+                    "schedule": schedule_for(start, jump, weeks, desired),
+                })
+            return plans
+
+        def batched():
+            return list(plan_batches(athletes, options["chunk_size"]))
+
+        if per_athlete() != batched():
+            self.stderr.write(self.style.ERROR("The batched plans differ from the per-athlete plans."))
+            return
+
+        for name, run in (("per-athlete", per_athlete), ("batched", batched)):
+            best = min(self._time(run) for _ in range(options["repeat"]))
+            self.stdout.write(
+                f"{name:>12}: {best * 1000:8.1f} ms for {len(athletes)} athletes "
+                f"({len(athletes) / best:,.0f} plans/s)"
+            )
+
+    def _time(self, run):
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
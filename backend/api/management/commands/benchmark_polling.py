@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import MemeListCreateView, RunnerListView, StoryListCreateView, TimelineEventListView
+
+USERNAME = "polling-benchmark"
+
+ENDPOINTS = [
+    ("/api/runners/", RunnerListView),
+    ("/api/memes/", MemeListCreateView),
+    ("/api/stories/", StoryListCreateView),
+    ("/api/timeline/", TimelineEventListView),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a client polling the list endpoints, once re-downloading every "
+        "time and once revalidating with If-None-Match, and report bytes and "
+        "CPU time per poll. Uses whatever data the database holds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--polls", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        polls = options["polls"]
+        user, _ = User.objects.get_or_create(username=USERNAME)
+        # Serializers build absolute media URLs, so the host must be allowed.
+        factory = APIRequestFactory(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+
+        def poll(path, view, **headers):
+            request = factory.get(path, **headers)
+            force_authenticate(request, user=user)
+            response = view(request)
+            if hasattr(response, "render"):
+                # A 304 from ConditionalListMixin is a plain HttpResponse.
+                response.render()
+            return response
+
+        try:
+            for path, view_class in ENDPOINTS:
+                view = view_class.as_view()
+                etag = poll(path, view)["ETag"]
+                for mode, headers in (("full", {}), ("If-None-Match", {"HTTP_IF_NONE_MATCH": etag})):
+                    sent = 0
+                    started = time.process_time()
+                    for _ in range(polls):
+                        response = poll(path, view, **headers)
+                        sent += len(response.content) + sum(len(k) + len(v) + 4 for k, v in response.items())
+                    cpu = time.process_time() - started
+                    self.stdout.write(
+                        f"{path:>15} {mode:>13}: {response.status_code}, {sent / polls:8.0f} bytes/poll, "
+                        f"{cpu / polls * 1e6:7.1f} µs CPU/poll"
+                    )
+        finally:
+            User.objects.filter(username=USERNAME).delete()
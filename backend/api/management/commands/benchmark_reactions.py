@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import Story
+from api.views import BulkReactionView, ReactionCreateView
+
+USERNAME_PREFIX = "reaction-storm-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Send story reactions from many threads at once, half of them "
+        "duplicates, and report throughput. Creates (and afterwards deletes) "
+        "its own users and stories."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--stories", type=int, default=20)
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        author = User.objects.create(username=f"{USERNAME_PREFIX}author")
+        stories = Story.objects.bulk_create(
+            Story(author=author, content=f"Story {i}") for i in range(options["stories"])
+        )
+        users = User.objects.bulk_create(
+            User(username=f"{USERNAME_PREFIX}{i}") for i in range(options["users"])
+        )
+        factory = APIRequestFactory()
+        single = ReactionCreateView.as_view()
+        bulk = BulkReactionView.as_view()
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def storm(offset):
+            local = Counter()
+            try:
+                for user in users[offset::threads]:
+                    # Every story one at a time, then all again in bulk (all duplicates).
+                    for story in stories:
+                        request = factory.post(f"/api/stories/{story.id}/react/")
+                        force_authenticate(request, user=user)
+                        local[("single", single(request, story_id=story.id).status_code)] += 1
+                    request = factory.post("/api/stories/react/bulk/", {"stories": [s.id for s in stories]}, format="json")
+                    force_authenticate(request, user=user)
+                    local[("bulk", bulk(request).status_code)] += 1
+            finally:
+                connections.close_all()
+                with lock:
+                    outcomes.update(local)
+
+        workers = [threading.Thread(target=storm, args=(t,)) for t in range(threads)]
+        started = time.perf_counter()
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+            counted = sum(Story.objects.filter(pk__in=[s.id for s in stories]).values_list("reactions_count", flat=True))
+        finally:
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+        requests = sum(outcomes.values())
+        self.stdout.write(
+            f"{requests} requests ({len(users) * len(stories)} reactions) from {threads} threads "
+            f"in {elapsed:.2f} s: {requests / elapsed:.0f} requests/s, "
+            f"{len(users) * len(stories) / elapsed:.0f} reactions/s"
+        )
+        for (kind, status), count in sorted(outcomes.items()):
+            self.stdout.write(f"  {kind} {status}: {count}")
+        self.stdout.write(f"reactions_count total: {counted} (expected {len(users) * len(stories)})")
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import Runner
+from api.views import MileageResultView, VoteCreateView
+
+USERNAME_PREFIX = "write-storm-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer VoteCreateView and MileageResultView from many threads and "
+        "report throughput and lock errors. Run it once with the default "
+        "SQLite settings and once with SQLITE_PROFILE=concurrent to compare. "
+        "It creates (and afterwards deletes) its own users and runner."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--requests", type=int, default=50, help="Requests per thread.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark targets SQLite.")
+
+        threads, per_thread = options["threads"], options["requests"]
+        self.stdout.write(f"SQLite profile: {settings.SQLITE_PROFILE}, {threads} threads x {per_thread} requests")
+
+        runner = Runner.objects.create(name=f"{USERNAME_PREFIX}runner")
+        users = User.objects.bulk_create(
+            User(username=f"{USERNAME_PREFIX}{i}") for i in range(threads * per_thread)
+        )
+        outcomes = Counter()
+        lock = threading.Lock()
+        factory = APIRequestFactory()
+        vote_view = VoteCreateView.as_view()
+        mileage_view = MileageResultView.as_view()
+
+        def storm(offset):
+            local = Counter()
+            try:
+                for i in range(per_thread):
+                    user = users[offset + i]
+                    # Alternate a vote (one per user) with a mileage plan.
+                    if i % 2:
+                        request = factory.post("/api/vote/", {"runner": runner.id}, format="json")
+                        view = vote_view
+                    else:
+                        request = factory.post(
+                            "/api/mileage/", {"age": "twentyforty", "injury": "no", "desiredMileage": 40}, format="json"
+                        )
+                        view = mileage_view
+                    force_authenticate(request, user=user)
+                    try:
+                        response = view(request)
+                        local[response.status_code] += 1
+                    except OperationalError as e:
+                        local["locked" if "locked" in str(e) else "error"] += 1
+            finally:
+                connections.close_all()
+                with lock:
+                    outcomes.update(local)
+
+        workers = [threading.Thread(target=storm, args=(t * per_thread,)) for t in range(threads)]
+        started = time.perf_counter()
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            # Votes and mileage results cascade with the users.
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+            runner.delete()
+
+        total = sum(outcomes.values())
+        ok = sum(count for status, count in outcomes.items() if status in (200, 201))
+        self.stdout.write(f"{total} requests in {elapsed:.2f} s: {ok / elapsed:.0f} successful writes/s")
+        for status, count in sorted(outcomes.items(), key=str):
+            self.stdout.write(f"  {status}: {count}")
+        # MileageResultView turns any exception, including a lock error, into a 500.
+        if outcomes["locked"] or outcomes[500]:
+            self.stdout.write(self.style.WARNING("Writes failed under contention."))
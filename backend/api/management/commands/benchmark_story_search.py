@@ -0,0 +1,77 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.caching import bump_model_versions
+from api.models import Story
+from api.search import PostgresSearchEngine, ScanSearchEngine, SQLiteFTSSearchEngine, sqlite_index_in_sync
+
+USERNAME = "search-benchmark"
+
+# A Zipf-ish vocabulary: a few words appear in most stories, most are rare.
+COMMON = ["run", "mile", "race", "pace", "training", "morning", "long", "easy"]
+RARE = [f"{a}{b}" for a in ("tempo", "hill", "trail", "track", "fartlek") for b in ("ing", "er", "s", "ed")]
+QUERIES = ["run", "training pace", "fartleks", "trail", "marathon"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill api_story with synthetic stories and compare search latency of "
+        "the full-text engine for this database with the substring scan. "
+        "Creates (and afterwards deletes) its own author and stories."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stories", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5, help="Runs of each query.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        engines = [ScanSearchEngine()]
+        if connection.vendor == "postgresql":
+            engines.append(PostgresSearchEngine())
+        elif connection.vendor == "sqlite" and sqlite_index_in_sync():
+            engines.append(SQLiteFTSSearchEngine())
+
+        author = User.objects.create(username=USERNAME)
+        try:
+            started = time.perf_counter()
+            self.fill(author, options["stories"], options["batch_size"])
+            self.stdout.write(f"{options['stories']} stories written in {time.perf_counter() - started:.1f} s")
+
+            for query in QUERIES:
+                for engine in engines:
+                    timings = []
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        hits = engine.search(query, 0, 20)
+                        timings.append(time.perf_counter() - started)
+                    self.stdout.write(
+                        f"{query!r:>18} {engine.name:>12}: median {statistics.median(timings) * 1000:8.1f} ms, "
+                        f"{len(hits)} hits on the first page"
+                    )
+        finally:
+            # Deleted in one statement; the collector would load every story.
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM api_story WHERE author_id = %s", [author.id])
+            author.delete()
+            bump_model_versions(Story)
+
+    def fill(self, author, count, batch_size):
+        rng = random.Random(0)
+        for start in range(0, count, batch_size):
+            with transaction.atomic():
+                Story.objects.bulk_create(
+                    Story(author=author, content=self.sentence(rng))
+                    for _ in range(min(batch_size, count - start))
+                )
+
+    def sentence(self, rng):
+        words = rng.choices(COMMON, k=rng.randint(8, 30))
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words)), rng.choice(RARE))
+        return " ".join(words).capitalize() + "."
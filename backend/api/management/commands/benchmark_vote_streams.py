@@ -0,0 +1,89 @@
+import asyncio
+import io
+import resource
+import time
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.management.base import BaseCommand
+
+from api.models import Runner
+from api.views import votes_sse_stream
+from api.vote_stream import get_stream_slots, publish_vote_change
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/api/vote/stream/",
+    "query_string": b"",
+    "headers": [],
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold many idle vote streams open in one event loop, as the ASGI "
+        "server would, and report memory per stream and how long one vote "
+        "change takes to reach all of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--streams", type=int, default=5000)
+        parser.add_argument("--changes", type=int, default=10)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options["streams"], options["changes"]))
+
+    async def run(self, count, changes):
+        runner_id = await Runner.objects.values_list("id", flat=True).afirst() or 0
+        slots = get_stream_slots()
+        rss_before = peak_rss_mb()
+        received = asyncio.Queue()
+        readers, refused = [], 0
+
+        async def read(response):
+            async for chunk in response.streaming_content:
+                if chunk.startswith(b"id:"):
+                    received.put_nowait(chunk)
+
+        started = time.perf_counter()
+        for _ in range(count):
+            response = votes_sse_stream(ASGIRequest(dict(SCOPE), io.BytesIO()))
+            if response.status_code != 200:
+                refused += 1
+                continue
+            readers.append(asyncio.create_task(read(response)))
+        opened = len(readers)
+        for _ in range(opened):
+            await received.get()  # every stream's snapshot
+        elapsed = time.perf_counter() - started
+        rss_after = peak_rss_mb()
+
+        self.stdout.write(
+            f"{opened} streams open ({refused} refused, limit {slots.limit or 'none'}) "
+            f"in {elapsed:.2f} s; peak RSS {rss_before:.0f} -> {rss_after:.0f} MB, "
+            f"{(rss_after - rss_before) * 1024 / max(opened, 1):.1f} KB/stream"
+        )
+
+        latencies = []
+        for _ in range(changes):
+            started = time.perf_counter()
+            publish_vote_change(runner_id, 0)
+            for _ in range(opened):
+                await received.get()
+            latencies.append(time.perf_counter() - started)
+        if latencies:
+            latencies.sort()
+            self.stdout.write(
+                f"fan-out of one change to {opened} streams: "
+                f"median {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms"
+            )
+
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        self.stdout.write(f"slots still held after closing: {slots.active}")
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import UploadSession
+from api.uploads import discard
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads that were started but not finalized in time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24,
+                            help="Age after which an unfinished upload is discarded.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = UploadSession.objects.filter(created_at__lt=cutoff)
+        count = 0
+        for session in stale.iterator():
+            discard(session)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Discarded {count} stale uploads."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.query_plans import explain, hot_queries, plan_problems
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot API queries and fail if any of them falls back to a "
+        "full table scan or a temporary sort, or if a cursor page doesn't "
+        "seek its index."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Query plans can't be checked on {connection.vendor}.")
+
+        failures = []
+        for query in hot_queries():
+            plan = explain(query.queryset)
+            problems = plan_problems(plan, query.seek)
+            if options["verbosity"] >= 2 or problems:
+                self.stdout.write(f"{query.name}:\n{plan}\n")
+            if problems:
+                failures.append(f"{query.name}: {', '.join(problems)}")
+
+        if failures:
+            raise CommandError("Unindexed query plans:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index for filtering and ordering."))
@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Meme, Runner
+from api.storage import content_addressed_storage, is_content_addressed, retain
+
+
+class Command(BaseCommand):
+    help = "Move existing meme and runner images into content-addressed storage and report the space reclaimed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Hash the files and report savings without changing anything.")
+
+    def handle(self, *args, **options):
+        storage = content_addressed_storage()
+        dry_run = options["dry_run"]
+        legacy_files = {}
+        blobs = {}
+        moved = 0
+
+        for model in (Meme, Runner):
+            for pk, name in model.objects.exclude(image="").exclude(image__isnull=True).values_list("pk", "image"):
+                if is_content_addressed(name):
+                    continue
+                if not storage.exists(name):
+                    self.stderr.write(f"Missing file for {model.__name__} {pk}: {name}")
+                    continue
+
+                if dry_run:
+                    with storage.open(name, "rb") as f:
+                        blob = storage.blob_name(name, _sha256(f))
+                else:
+                    with storage.open(name, "rb") as f, transaction.atomic():
+                        blob = storage.save(name, File(f))
+                        model.objects.filter(pk=pk).update(image=blob)
+                        retain([blob])
+                legacy_files[name] = storage.size(name)
+                blobs[blob] = legacy_files[name]
+                moved += 1
+
+        if not dry_run:
+            for name in legacy_files:
+                os.remove(storage.path(name))
+
+        before = sum(legacy_files.values())
+        after = sum(blobs.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would move' if dry_run else 'Moved'} {moved} images from {len(legacy_files)} files "
+            f"into {len(blobs)} blobs: {before} -> {after} bytes ({before - after} bytes reclaimed)."
+        ))
+
+
+def _sha256(f):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(64 * 1024), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.search import FTS_TABLE, rebuild_sqlite_index, reset_search_engine
+
+
+class Command(BaseCommand):
+    help = "Recreate the SQLite story search triggers and reindex every story."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Only the SQLite FTS5 index needs rebuilding; Postgres indexes the column directly.")
+        if FTS_TABLE not in connection.introspection.table_names():
+            raise CommandError(f"{FTS_TABLE} doesn't exist; this SQLite build may lack FTS5.")
+
+        with transaction.atomic():
+            rebuild_sqlite_index()
+        reset_search_engine()
+        self.stdout.write(self.style.SUCCESS("Story search index rebuilt."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.models import Reaction, Runner, Story, Vote
+
+
+def count_of(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .values(field)
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized vote and reaction counters from their source tables."
+
+    def handle(self, *args, **options):
+        for label, model, counter, actual in (
+            ("Runner vote counts", Runner, 'vote_count', count_of(Vote, 'runner')),
+            ("Story reaction counts", Story, 'reactions_count', count_of(Reaction, 'story')),
+        ):
+            with transaction.atomic():
+                drifted = model.objects.annotate(actual=actual).exclude(**{counter: F('actual')}).count()
+                model.objects.update(**{counter: actual})
+
+            self.stdout.write(self.style.SUCCESS(f"{label} reconciled ({drifted} corrected)."))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.stats import refresh_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the stats dashboard snapshot, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Keep running and refresh every INTERVAL seconds.")
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            _, stats = refresh_stats()
+            self.stdout.write(f"Stats snapshot refreshed at {stats['generated_at']}")
+            if not interval:
+                break
+            time.sleep(interval)
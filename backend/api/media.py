@@ -0,0 +1,51 @@
+import re
+
+from django.conf import settings
+
+from .storage import is_content_addressed
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header,
+    ``None`` when it should be ignored (absent or multi-range), or
+    ``False`` when it cannot be satisfied.
+    """
+    match = RANGE_RE.match((header or "").strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return False
+        start, end = max(0, size - length), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def iter_file_range(f, start, end):
+    f.seek(start)
+    remaining = end - start + 1
+    try:
+        while remaining > 0:
+            block = f.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+def media_cache_control(name):
+    if is_content_addressed(name):
+        return "public, max-age=31536000, immutable"
+    return f"public, max-age={getattr(settings, 'MEDIA_CACHE_SECONDS', 86400)}"
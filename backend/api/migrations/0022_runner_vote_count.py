@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_vote_counts(apps, schema_editor):
+    Runner = apps.get_model('api', 'Runner')
+    Vote = apps.get_model('api', 'Vote')
+    counts = (
+        Vote.objects.filter(runner=OuterRef('pk'))
+        .values('runner')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Runner.objects.update(vote_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_rename_age_group_mileageresult_age_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='runner',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_vote_counts, migrations.RunPython.noop),
+    ]
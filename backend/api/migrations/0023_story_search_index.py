@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:05
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE api_story_fts USING fts5(
+        content, content='api_story', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER api_story_fts_insert AFTER INSERT ON api_story BEGIN
+        INSERT INTO api_story_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER api_story_fts_delete AFTER DELETE ON api_story BEGIN
+        INSERT INTO api_story_fts(api_story_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER api_story_fts_update AFTER UPDATE OF content ON api_story BEGIN
+        INSERT INTO api_story_fts(api_story_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO api_story_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    "INSERT INTO api_story_fts(api_story_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS api_story_fts_insert",
+    "DROP TRIGGER IF EXISTS api_story_fts_delete",
+    "DROP TRIGGER IF EXISTS api_story_fts_update",
+    "DROP TABLE IF EXISTS api_story_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX IF NOT EXISTS api_story_content_search ON api_story USING GIN (to_tsvector('english', content))",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS api_story_content_search",
+]
+
+
+def sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite' and sqlite_has_fts5(schema_editor):
+        statements = SQLITE_FORWARD
+    elif vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_runner_vote_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:02
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='meme',
+            name='image',
+            field=models.ImageField(storage=api.storage.content_addressed_storage, upload_to='memes/'),
+        ),
+        migrations.AlterField(
+            model_name='runner',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.content_addressed_storage, upload_to='runners/'),
+        ),
+    ]
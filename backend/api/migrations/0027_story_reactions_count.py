@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_reaction_counts(apps, schema_editor):
+    Story = apps.get_model('api', 'Story')
+    Reaction = apps.get_model('api', 'Reaction')
+    counts = (
+        Reaction.objects.filter(story=OuterRef('pk'))
+        .values('story')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Story.objects.update(reactions_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_storedblob_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_story_reactions_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meme',
+            index=models.Index(fields=['-created_at', '-id'], name='meme_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runner',
+            index=models.Index(condition=models.Q(('is_quiz_runner', True)), fields=['quiz_order'], name='runner_quiz_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['-created_at', '-id'], name='story_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineevent',
+            index=models.Index(fields=['order', 'year', 'id'], name='timeline_event_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mileageresult',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='mileage_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mileageresult',
+            index=models.Index(fields=['user', 'desired_mileage', 'id'], name='mileage_user_desired_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mileageresult',
+            index=models.Index(fields=['user', 'age', 'desired_mileage', 'id'], name='mileage_user_age_desired_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:40
+
+from django.db import migrations
+
+# Adding Story.reactions_count (0027) makes SQLite rebuild api_story, which
+# drops the triggers 0023 created to keep api_story_fts in sync. Recreate
+# them and reindex whatever was written in between.
+SQLITE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS api_story_fts_insert",
+    "DROP TRIGGER IF EXISTS api_story_fts_delete",
+    "DROP TRIGGER IF EXISTS api_story_fts_update",
+    """CREATE TRIGGER api_story_fts_insert AFTER INSERT ON api_story BEGIN
+        INSERT INTO api_story_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER api_story_fts_delete AFTER DELETE ON api_story BEGIN
+        INSERT INTO api_story_fts(api_story_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER api_story_fts_update AFTER UPDATE OF content ON api_story BEGIN
+        INSERT INTO api_story_fts(api_story_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO api_story_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    "INSERT INTO api_story_fts(api_story_fts) VALUES ('rebuild')",
+]
+
+
+def restore_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if 'api_story_fts' not in connection.introspection.table_names(cursor):
+            return
+    for statement in SQLITE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,130 @@
+import base64
+import binascii
+import json
+
+import numpy as np
+
+AGE_GROUPS = ["twentyless", "twentyforty", "fiftymore"]
+INJURY_CHOICES = ["yes", "no"]
+
+# (age, injury) -> (start mileage, weekly jump, highest mileage we plan up to).
+PLAN_RULES = {
+    ("twentyless", "yes"): (20, 3, 70),
+    ("twentyless", "no"): (25, 4, 70),
+    ("twentyforty", "yes"): (20, 3, None),
+    ("twentyforty", "no"): (20, 4, None),
+    ("fiftymore", "yes"): (15, 2, 50),
+    ("fiftymore", "no"): (20, 3, 50),
+}
+
+_AGE_CODES = {age: code for code, age in enumerate(AGE_GROUPS)}
+NO_CAP = np.iinfo(np.int64).max
+
+# The same rules as lookup tables indexed by [age code, injury code].
+_START = np.array([[PLAN_RULES[age, injury][0] for injury in INJURY_CHOICES] for age in AGE_GROUPS], dtype=np.int64)
+_JUMP = np.array([[PLAN_RULES[age, injury][1] for injury in INJURY_CHOICES] for age in AGE_GROUPS], dtype=np.int64)
+_CAP = np.array(
+    [[PLAN_RULES[age, injury][2] or NO_CAP for injury in INJURY_CHOICES] for age in AGE_GROUPS], dtype=np.int64
+)
+
+
+def _age_group(age):
+    # Anything that isn't one of the capped groups plans like twentyforty.
+    return age if age in AGE_GROUPS else "twentyforty"
+
+
+def _injury(injury):
+    return "yes" if injury == "yes" else "no"
+
+
+def plan_for(age, injury, desired):
+    """
+    Return ``(start, jump, weeks, desired)`` for a single athlete, with
+    ``desired`` capped for the age group. Plain Python: for one plan this is
+    cheaper than building arrays.
+    """
+    start, jump, cap = PLAN_RULES[_age_group(age), _injury(injury)]
+    if cap is not None:
+        desired = min(desired, cap)
+    start = min(start, desired)
+    weeks = max(0, round((desired - start) / jump))
+    return start, jump, weeks, desired
+
+
+def schedule_for(start, jump, weeks, desired):
+    """Week-by-week mileage for one plan; the scalar twin of PlanBatch.schedules()."""
+    return [min(start + jump * week, desired) for week in range(weeks)] + [desired]
+
+
+class PlanBatch:
+    """Plans for many athletes at once, computed column-wise with NumPy."""
+
+    def __init__(self, ages, injuries, desired):
+        age_codes = np.array([_AGE_CODES[_age_group(age)] for age in ages], dtype=np.intp)
+        injury_codes = (np.asarray(injuries, dtype=object) != "yes").astype(np.intp)
+
+        self.desired = np.minimum(np.asarray(desired, dtype=np.int64), _CAP[age_codes, injury_codes])
+        self.start = np.minimum(_START[age_codes, injury_codes], self.desired)
+        self.jump = _JUMP[age_codes, injury_codes]
+        # np.round rounds halves to even, exactly like round() in plan_for().
+        self.weeks = np.maximum(0, np.round((self.desired - self.start) / self.jump)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.desired)
+
+    def schedules(self):
+        """
+        Week-by-week mileage (week 0 is the starting mileage, the last week
+        the target) as an ``(athletes, max weeks + 1)`` array. Rows are
+        padded with their target past their own ``weeks``.
+        """
+        if not len(self):
+            return np.zeros((0, 1), dtype=np.int64)
+        week = np.arange(self.weeks.max() + 1)
+        mileage = self.start[:, None] + self.jump[:, None] * week
+        # Rounding can leave the last step short of or past the target.
+        return np.where(week >= self.weeks[:, None], self.desired[:, None], np.minimum(mileage, self.desired[:, None]))
+
+    def rows(self):
+        schedules = self.schedules()
+        for i, (start, jump, weeks, desired) in enumerate(
+            zip(self.start.tolist(), self.jump.tolist(), self.weeks.tolist(), self.desired.tolist())
+        ):
+            yield {
+                "start_mileage": start,
+                "jump": jump,
+                "weeks": weeks,
+                "desired_mileage": desired,
+                "schedule": schedules[i, :weeks + 1].tolist(),
+            }
+
+
+def plan_batches(athletes, chunk_size=1000):
+    """
+    Yield one plan per athlete (dicts with age, injury and desiredMileage),
+    in order. Athletes are planned ``chunk_size`` at a time so one very long
+    schedule doesn't widen the array for the whole batch.
+    """
+    for offset in range(0, len(athletes), chunk_size):
+        chunk = athletes[offset:offset + chunk_size]
+        batch = PlanBatch(
+            [athlete["age"] for athlete in chunk],
+            [athlete["injury"] for athlete in chunk],
+            [athlete["desiredMileage"] for athlete in chunk],
+        )
+        yield from batch.rows()
+
+
+def encode_sync_token(result_id):
+    """Opaque marker for "every MileageResult up to and including this one"."""
+    raw = json.dumps({"r": result_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token):
+    """Return the MileageResult id in a sync token, or None if it is invalid."""
+    try:
+        result_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))["r"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+    return result_id if isinstance(result_id, int) and result_id >= 0 else None
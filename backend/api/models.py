@@ -1,5 +1,9 @@
+import uuid
+
 from django.db import models
 
+from .storage import content_addressed_storage
+
 # Create your models here.
 
 from django.contrib.auth.models import User
@@ -14,19 +18,37 @@ class Meme(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=200, blank=True)
-    image = models.ImageField(upload_to='memes/')
+    image = models.ImageField(upload_to='memes/', storage=content_addressed_storage)
+    # Resized/WebP copies of `image`, filled in by api.images in the background.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='general')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # The feed's keyset order (api.pagination.KeysetPagination).
+            models.Index(fields=["-created_at", "-id"], name="meme_feed_idx"),
+        ]
+
     def __str__(self):
         return self.title or f"Meme by {self.user.username}"
 
 class Runner(models.Model):
     name = models.CharField(max_length=100)
-    image = models.ImageField(upload_to="runners/", null=True, blank=True)
+    image = models.ImageField(upload_to="runners/", storage=content_addressed_storage, null=True, blank=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField(blank=True)
     is_quiz_runner = models.BooleanField(default=False)
     quiz_order = models.PositiveIntegerField(null=True, blank=True)
+    # Maintained by the Vote signals; `manage.py reconcile_counts` repairs drift.
+    vote_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Partial, because filter(is_quiz_runner=True) compiles to a bare
+            # boolean column that can't seek a (is_quiz_runner, ...) index.
+            models.Index(fields=["quiz_order"], condition=models.Q(is_quiz_runner=True), name="runner_quiz_order_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -63,10 +85,24 @@ class Answer(models.Model):
     def __str__(self):
         return f"Answer to '{self.question.text}'"
 
+class StoryQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Stories with their author joined, for serializing in one query."""
+        return self.select_related("author")
+
 class Story(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="stories")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by api.reactions and the Reaction signals; `manage.py reconcile_counts` repairs drift.
+    reactions_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = StoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="story_feed_idx"),
+        ]
 
     def __str__(self):
         return f"Story by {self.author.username}"
@@ -98,6 +134,9 @@ class TimelineEvent(models.Model):
 
     class Meta:
         ordering = ['order', 'year']
+        indexes = [
+            models.Index(fields=["order", "year", "id"], name="timeline_event_order_idx"),
+        ]
 
     def __str__(self):
         return f"{self.year}"
@@ -122,5 +161,42 @@ class MileageResult(models.Model):
     weeks = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # The orderings offered by MileageHistoryView, per user.
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="mileage_user_recent_idx"),
+            models.Index(fields=["user", "desired_mileage", "id"], name="mileage_user_desired_idx"),
+            models.Index(fields=["user", "age", "desired_mileage", "id"], name="mileage_user_age_desired_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} mileage result"
+
+class UploadSession(models.Model):
+    KIND_CHOICES = [
+        ('meme', 'Meme'),
+        ('runner', 'Runner'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received}/{self.size} bytes)"
+
+
+class StoredBlob(models.Model):
+    """A content-addressed media file and how many image fields point at it."""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"{self.user.username} mileage result"
\ No newline at end of file
+        return f"{self.name} ({self.refcount} refs)"
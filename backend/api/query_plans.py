@@ -0,0 +1,104 @@
+"""
+The hot API queries and the EXPLAIN checks that keep them on their indexes,
+shared by api.tests and `manage.py explain_hot_queries`.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import MileageResult, Vote
+from .pagination import KeysetPagination
+
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)")
+SQLITE_TEMP_SORT = re.compile(r"\bUSE TEMP B-TREE\b")
+# A seek: an index search whose constraint includes a range on a column.
+SQLITE_RANGE_SEEK = re.compile(r"\bSEARCH \w+ USING (?:(?:COVERING )?INDEX \w+|INTEGER PRIMARY KEY) \([^)]*[<>]")
+POSTGRES_FULL_SCAN = re.compile(r"\bSeq Scan\b")
+POSTGRES_SORT = re.compile(r"^\s*(->\s*)?(Incremental )?Sort\b", re.MULTILINE)
+POSTGRES_RANGE_SEEK = re.compile(r"Index Cond: .*[<>]")
+
+
+class HotQuery:
+    def __init__(self, name, queryset, seek=False):
+        self.name = name
+        self.queryset = queryset
+        # Must start at a cursor through the index, not walk it from the top.
+        self.seek = seek
+
+
+def _cursor_value(field, now):
+    name = field.lstrip("-")
+    if name == "created_at":
+        return now
+    if name == "year":
+        return ""
+    return 0
+
+
+def keyset_pages(name, queryset, ordering, now):
+    """The first page and a later page of a keyset-paginated list."""
+    queryset = queryset.order_by(*ordering)
+    position = [_cursor_value(field, now) for field in ordering]
+    after = KeysetPagination(ordering)._after(position)
+    limit = KeysetPagination.max_page_size + 1
+    return [
+        HotQuery(name, queryset[:limit]),
+        HotQuery(f"{name} (after cursor)", queryset.filter(after)[:limit], seek=True),
+    ]
+
+
+def hot_queries():
+    # Imported here: api.views imports half the app.
+    from .views import MemeListCreateView, MileageHistoryView, QuizRunnersView, StoryListCreateView, TimelineEventListView
+
+    now = timezone.now()
+    feed = KeysetPagination.ordering
+
+    queries = []
+    queries += keyset_pages("memes", MemeListCreateView.queryset, feed, now)
+    queries += keyset_pages("stories", StoryListCreateView.queryset, feed, now)
+    queries += keyset_pages("timeline", TimelineEventListView.queryset, TimelineEventListView.keyset_ordering, now)
+    queries.append(HotQuery("quiz runners", QuizRunnersView().get_queryset()))
+    queries.append(HotQuery("votes by runner", Vote.objects.values("runner").annotate(count=Count("id"))))
+
+    mileage = MileageResult.objects.filter(user_id=0)
+    queries.append(HotQuery("latest mileage", mileage.order_by("-created_at")[:1]))
+    queries.append(HotQuery("mileage sync", mileage.filter(id__gt=0).order_by("id")[:101], seek=True))
+    for sort, ordering in MileageHistoryView.orderings.items():
+        sort = sort or "recent"
+        queries += keyset_pages(f"mileage history sort={sort}", mileage, ordering, now)
+        queries += keyset_pages(f"mileage history sort={sort} age=twentyless", mileage.filter(age="twentyless"), ordering, now)
+    return queries
+
+
+def explain(queryset):
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # Tiny tables make a sequential scan the cheapest plan; ask what
+            # would happen once the data outgrows that.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def plan_problems(plan, seek=False):
+    """Why ``plan`` isn't index-only filtering and ordering; empty if it is."""
+    problems = []
+    if connection.vendor == "sqlite":
+        problems += [f"full scan of {table}" for table in SQLITE_FULL_SCAN.findall(plan)]
+        if SQLITE_TEMP_SORT.search(plan):
+            problems.append("temp B-tree sort")
+        if seek and not SQLITE_RANGE_SEEK.search(plan):
+            problems.append("no index range seek")
+    elif connection.vendor == "postgresql":
+        if POSTGRES_FULL_SCAN.search(plan):
+            problems.append("sequential scan")
+        if POSTGRES_SORT.search(plan):
+            problems.append("sort")
+        if seek and not POSTGRES_RANGE_SEEK.search(plan):
+            problems.append("no index range seek")
+    else:
+        raise NotImplementedError(f"Query plans can't be checked on {connection.vendor}.")
+    return problems
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .caching import bump_model_versions, model_versions, record_cache_result
+from .db_router import primary_reads
+from .models import Quiz
+from .serializers import QuizSerializer
+
+# Every cached quiz document is keyed by the Quiz change counter, which the
+# signals bump on any Quiz/Question/Answer change. One counter for all of
+# them also covers a question or answer that moves between quizzes.
+
+
+def _timeout():
+    return getattr(settings, "QUIZ_CACHE_TIMEOUT", None)
+
+
+def quiz_cache_version():
+    return model_versions(Quiz)[0]
+
+
+def invalidate_quizzes():
+    bump_model_versions(Quiz)
+
+
+def compile_quizzes(queryset):
+    """
+    Serialize quizzes with their questions and answers in three queries, read
+    from the primary since the result is cached under the current version.
+    """
+    queryset = queryset.prefetch_related("questions__answers").order_by("id")
+    with primary_reads():
+        return [dict(doc) for doc in QuizSerializer(queryset, many=True).data]
+
+
+def get_quiz_list():
+    key = f"quiz:{quiz_cache_version()}:list"
+    documents = cache.get(key)
+    record_cache_result("QuizListView", documents is not None)
+    if documents is None:
+        documents = compile_quizzes(Quiz.objects.all())
+        cache.set(key, documents, _timeout())
+    return documents
+
+
+def get_quiz_document(quiz_id):
+    key = f"quiz:{quiz_cache_version()}:doc:{quiz_id}"
+    document = cache.get(key)
+    record_cache_result("QuizDetailView", document is not None)
+    if document is None:
+        documents = compile_quizzes(Quiz.objects.filter(id=quiz_id))
+        if not documents:
+            return None
+        document = documents[0]
+        cache.set(key, document, _timeout())
+    return document
+
+
+class AnswerKey:
+    """Which answers belong to which question of a quiz, and which are correct."""
+
+    def __init__(self, document, version):
+        self.version = version
+        self.quiz_id = document["id"]
+        self.has_correct_answers = document["has_correct_answers"]
+        self.total = len(document["questions"])
+        self.question_of = {}
+        self.correct = set()
+        for question in document["questions"]:
+            for answer in question["answers"]:
+                self.question_of[answer["id"]] = question["id"]
+                if answer["is_correct"]:
+                    self.correct.add(answer["id"])
+
+    def validate(self, answer_ids):
+        """Return a list of problems with a submission (empty when it is valid)."""
+        errors = []
+        answered = set()
+        for answer_id in answer_ids:
+            question_id = self.question_of.get(answer_id)
+            if question_id is None:
+                errors.append(f"Answer {answer_id} does not belong to this quiz.")
+            elif question_id in answered:
+                errors.append(f"More than one answer given for question {question_id}.")
+            else:
+                answered.add(question_id)
+        return errors
+
+    def score(self, answer_ids):
+        if not self.has_correct_answers:
+            return {"quiz": self.quiz_id, "result": answer_ids}
+        correct_count = sum(1 for answer_id in answer_ids if answer_id in self.correct)
+        return {
+            "quiz": self.quiz_id,
+            "score": correct_count,
+            "total": self.total,
+            "passed": correct_count == self.total,
+        }
+
+
+_answer_keys = {}
+
+
+def get_answer_key(quiz_id):
+    """
+    Return the AnswerKey for a quiz, built from its cached document and kept
+    in process memory until the quiz cache version changes.
+    """
+    version = quiz_cache_version()
+    answer_key = _answer_keys.get(quiz_id)
+    if answer_key is None or answer_key.version != version:
+        document = get_quiz_document(quiz_id)
+        if document is None:
+            return None
+        answer_key = AnswerKey(document, version)
+        _answer_keys[quiz_id] = answer_key
+    return answer_key
@@ -0,0 +1,43 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import bump_model_versions
+from .models import Reaction, Story
+
+
+def add_reactions(user_id, story_ids):
+    """
+    React to each of ``story_ids`` as ``user_id`` and return the rows that
+    were actually inserted, as ``(reaction_id, story_id, created_at)``.
+
+    A single ``INSERT ... ON CONFLICT DO NOTHING`` skips stories already
+    reacted to (and ids that don't exist) without a separate exists()
+    check, so concurrent requests can't race into the unique constraint.
+    The stories' reactions_count is bumped in the same transaction.
+    """
+    story_ids = sorted(set(story_ids))
+    if not story_ids:
+        return []
+
+    reaction_table = connection.ops.quote_name(Reaction._meta.db_table)
+    story_table = connection.ops.quote_name(Story._meta.db_table)
+    placeholders = ", ".join(["%s"] * len(story_ids))
+    sql = (
+        f"INSERT INTO {reaction_table} (user_id, story_id, created_at) "
+        f"SELECT %s, id, %s FROM {story_table} WHERE id IN ({placeholders}) "
+        f"ON CONFLICT DO NOTHING RETURNING id, story_id"
+    )
+    now = timezone.now()
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, connection.ops.adapt_datetimefield_value(now), *story_ids])
+            inserted = cursor.fetchall()
+        if inserted:
+            Story.objects.filter(pk__in=[story_id for _, story_id in inserted]).update(
+                reactions_count=F("reactions_count") + 1
+            )
+            transaction.on_commit(lambda: bump_model_versions(Story, Reaction))
+
+    return [(reaction_id, story_id, now) for reaction_id, story_id in inserted]
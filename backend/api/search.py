@@ -0,0 +1,191 @@
+import base64
+import binascii
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+
+from .models import Story
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Placeholders the database wraps around matched terms; the snippet is
+# HTML-escaped first and they are then swapped for <mark> tags.
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+FTS_TABLE = "api_story_fts"
+FTS_TRIGGERS = ("api_story_fts_insert", "api_story_fts_delete", "api_story_fts_update")
+
+
+def highlight(snippet):
+    return escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query)
+
+
+class ScanSearchEngine:
+    """Substring scan; the fallback when no full-text index is available."""
+
+    name = "scan"
+
+    def search(self, query, offset, limit):
+        stories = (
+            Story.objects.filter(content__icontains=query)
+            .order_by("-created_at", "-id")
+            .values_list("id", "content")[offset:offset + limit]
+        )
+        return [(story_id, self._snippet(content, query)) for story_id, content in stories]
+
+    def _snippet(self, content, query, radius=60):
+        position = content.lower().find(query.lower())
+        if position < 0:
+            return content[:2 * radius]
+        start = max(0, position - radius)
+        end = position + len(query)
+        return (
+            ("…" if start else "")
+            + content[start:position]
+            + MARK_START + content[position:end] + MARK_END
+            + content[end:end + radius]
+        )
+
+
+class SQLiteFTSSearchEngine:
+    """FTS5 index kept in sync with api_story by triggers (migration 0023)."""
+
+    name = "sqlite-fts5"
+
+    def search(self, query, offset, limit):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"*' for term in terms)
+        sql = f"""
+            SELECT s.id, snippet({FTS_TABLE}, 0, %s, %s, '…', 16)
+            FROM {FTS_TABLE} JOIN api_story s ON s.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY bm25({FTS_TABLE}) / (1.0 + (julianday('now') - julianday(s.created_at)) / %s), s.id DESC
+            LIMIT %s OFFSET %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [MARK_START, MARK_END, match, recency_days(), limit, offset])
+            return cursor.fetchall()
+
+
+class PostgresSearchEngine:
+    """tsvector search backed by the GIN expression index from migration 0023."""
+
+    name = "postgres"
+
+    def search(self, query, offset, limit):
+        sql = """
+            SELECT s.id, ts_headline('english', s.content, q, %s)
+            FROM api_story s, websearch_to_tsquery('english', %s) q
+            WHERE to_tsvector('english', s.content) @@ q
+            ORDER BY ts_rank(to_tsvector('english', s.content), q)
+                     / (1 + EXTRACT(EPOCH FROM now() - s.created_at) / 86400 / %s) DESC,
+                     s.id DESC
+            LIMIT %s OFFSET %s
+        """
+        options = f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=24, MinWords=8"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [options, query, recency_days(), limit, offset])
+            return cursor.fetchall()
+
+
+def recency_days():
+    # Relevance is divided by (1 + age / recency_days): a story this many days
+    # old needs twice the text relevance to outrank a brand new one.
+    return getattr(settings, "STORY_SEARCH_RECENCY_DAYS", 30)
+
+
+def sqlite_index_in_sync():
+    """
+    Whether the FTS5 table exists together with the triggers that keep it in
+    sync. Rebuilding api_story (as SQLite migrations do for many schema
+    changes) drops the triggers, and searching the stale index would silently
+    miss every story written since.
+    """
+    if FTS_TABLE not in connection.introspection.table_names():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_story' AND name IN (%s, %s, %s)",
+            FTS_TRIGGERS,
+        )
+        found = {row[0] for row in cursor.fetchall()}
+    if found != set(FTS_TRIGGERS):
+        logger.warning(
+            f"{FTS_TABLE} is missing its sync triggers ({', '.join(sorted(set(FTS_TRIGGERS) - found))}); "
+            "falling back to scan search. Run `manage.py rebuild_search_index` to restore them."
+        )
+        return False
+    return True
+
+
+def rebuild_sqlite_index():
+    """(Re)create the FTS5 sync triggers and reindex every story."""
+    statements = [f"DROP TRIGGER IF EXISTS {name}" for name in FTS_TRIGGERS] + [
+        f"""CREATE TRIGGER api_story_fts_insert AFTER INSERT ON api_story BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+        END""",
+        f"""CREATE TRIGGER api_story_fts_delete AFTER DELETE ON api_story BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+        END""",
+        f"""CREATE TRIGGER api_story_fts_update AFTER UPDATE OF content ON api_story BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+        END""",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def reset_search_engine():
+    global _engine
+    _engine = None
+
+
+_engines = {
+    "scan": ScanSearchEngine,
+    "sqlite-fts5": SQLiteFTSSearchEngine,
+    "postgres": PostgresSearchEngine,
+}
+_engine = None
+
+
+def get_search_engine():
+    global _engine
+    if _engine is None:
+        name = getattr(settings, "STORY_SEARCH_ENGINE", "auto")
+        if name == "auto":
+            if connection.vendor == "postgresql":
+                name = "postgres"
+            elif connection.vendor == "sqlite" and sqlite_index_in_sync():
+                name = "sqlite-fts5"
+            else:
+                name = "scan"
+        _engine = _engines[name]()
+    return _engine
+
+
+def encode_page_token(offset):
+    raw = json.dumps({"o": offset}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_page_token(token):
+    """Return the offset stored in a search page token, or None if it is invalid."""
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))["o"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+    return offset if isinstance(offset, int) and offset >= 0 else None
@@ -1,7 +1,9 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
-from .models import Quiz, Question, Answer, Meme, Runner, Vote, Story, Reaction, WebsiteRating, TimelineEvent, TimelineReference, MileageResult
+from .models import Quiz, Question, Answer, Meme, Runner, Vote, Story, Reaction, WebsiteRating, TimelineEvent, TimelineReference, MileageResult, UploadSession
+from django.conf import settings
+from .uploads import EXTENSIONS
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
@@ -16,19 +18,51 @@ class UserSerializer(serializers.ModelSerializer):
         validated_data['password'] = make_password(validated_data['password'])
         return super(UserSerializer, self).create(validated_data)
 
-class MemeSerializer(serializers.ModelSerializer):
+class ImageVariantsMixin(serializers.Serializer):
+    """Adds the resized copies of ``image`` as ``variants`` and ``srcset``."""
+    variants = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+
+    def _variant_urls(self, obj):
+        if not obj.image:
+            return {}
+        storage = obj.image.storage
+        request = self.context.get("request")
+
+        def build_url(name):
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+
+        return {
+            fmt: {int(width): build_url(name) for width, name in names.items()}
+            for fmt, names in (obj.variants or {}).get("formats", {}).items()
+        }
+
+    def get_variants(self, obj):
+        return {
+            fmt: {str(width): url for width, url in sorted(urls.items())}
+            for fmt, urls in self._variant_urls(obj).items()
+        }
+
+    def get_srcset(self, obj):
+        return {
+            fmt: ", ".join(f"{url} {width}w" for width, url in sorted(urls.items()))
+            for fmt, urls in self._variant_urls(obj).items()
+        }
+
+class MemeSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     image = serializers.ImageField(use_url=True)
     class Meta:
         model = Meme
-        fields = ['id', 'user', 'title', 'image', 'category', 'created_at']
+        fields = ['id', 'user', 'title', 'image', 'variants', 'srcset', 'category', 'created_at']
         read_only_fields = ['user', 'created_at']
 
-class RunnerSerializer(serializers.ModelSerializer):
-    votes = serializers.IntegerField(source='vote_set.count', read_only=True)
+class RunnerSerializer(ImageVariantsMixin, serializers.ModelSerializer):
+    votes = serializers.IntegerField(source='vote_count', read_only=True)
 
     class Meta:
         model = Runner
-        fields = ['id', 'name', 'image', 'description', 'votes']
+        fields = ['id', 'name', 'image', 'variants', 'srcset', 'description', 'votes']
 
 class VoteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -63,10 +97,13 @@ class QuizSubmitSerializer(serializers.Serializer):
     quiz = serializers.IntegerField()
     answers = serializers.ListField(child=serializers.IntegerField())
 
+class QuizBatchSubmitSerializer(serializers.Serializer):
+    submissions = serializers.ListField(child=QuizSubmitSerializer(), allow_empty=False, max_length=1000)
+
 
 class StorySerializer(serializers.ModelSerializer):
     author_username = serializers.CharField(source="author.username", read_only=True)
-    reactions_count = serializers.IntegerField(source="reactions.count", read_only=True)
+    reactions_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Story
@@ -80,6 +117,9 @@ class ReactionSerializer(serializers.ModelSerializer):
         fields = ["id", "user", "story", "created_at"]
         read_only_fields = ["user"]
 
+class BulkReactionSerializer(serializers.Serializer):
+    stories = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=200)
+
 class WebsiteRatingSerializer(serializers.ModelSerializer):
     class Meta:
         model = WebsiteRating
@@ -135,3 +175,39 @@ class MileageInputSerializer(serializers.Serializer):
     age = serializers.ChoiceField(choices=["twentyless", "twentyforty", "fiftymore"])
     injury = serializers.ChoiceField(choices=["yes", "no"])
     desiredMileage = serializers.IntegerField(min_value=1)
+
+class MileageBatchAthleteSerializer(MileageInputSerializer):
+    # Bounds the schedule length (and so the response) for each athlete.
+    desiredMileage = serializers.IntegerField(min_value=1, max_value=1000)
+
+class MileageBatchSerializer(serializers.Serializer):
+    athletes = serializers.ListField(child=MileageBatchAthleteSerializer(), allow_empty=False, max_length=10000)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source="received", read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ["id", "kind", "filename", "content_type", "size", "offset"]
+
+    def validate_content_type(self, value):
+        # Only types with a known extension can be stored (uploads.EXTENSIONS).
+        if value not in settings.CHUNKED_UPLOAD_CONTENT_TYPES or value not in EXTENSIONS:
+            raise serializers.ValidationError(f"Unsupported content type: {value}")
+        return value
+
+    def validate_size(self, value):
+        if value == 0 or value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
+
+
+class UploadFinalizeSerializer(serializers.Serializer):
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$")
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True, default="")
+    category = serializers.ChoiceField(choices=Meme.CATEGORY_CHOICES, required=False, default="general")
+    name = serializers.CharField(max_length=100, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .caching import bump_model_versions
+from .images import variant_names
+from .models import Answer, Meme, Question, Quiz, Reaction, Runner, Story, TimelineEvent, TimelineReference, Vote
+from .quiz_cache import invalidate_quizzes
+from .storage import release, retain
+from .tasks import schedule_image_variants
+from .vote_counts import record_vote_count
+from .vote_stream import publish_vote_change
+
+
+@receiver(post_save, sender=Vote)
+def vote_saved(sender, instance, created, **kwargs):
+    if created:
+        runner_id = instance.runner_id
+        record_vote_count(runner_id, 1)
+        transaction.on_commit(lambda: publish_vote_change(runner_id, 1), robust=True)
+
+
+@receiver(post_delete, sender=Vote)
+def vote_deleted(sender, instance, **kwargs):
+    runner_id = instance.runner_id
+    record_vote_count(runner_id, -1)
+    transaction.on_commit(lambda: publish_vote_change(runner_id, -1), robust=True)
+
+
+@receiver(post_save, sender=Reaction)
+def reaction_saved(sender, instance, created, **kwargs):
+    # api.reactions inserts with raw SQL and bumps the counter itself; this
+    # keeps reactions made through the ORM (e.g. the admin) counted too.
+    if created:
+        Story.objects.filter(pk=instance.story_id).update(reactions_count=F("reactions_count") + 1)
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance, **kwargs):
+    Story.objects.filter(pk=instance.story_id, reactions_count__gt=0).update(reactions_count=F("reactions_count") - 1)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def quiz_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_quizzes)
+
+
+@receiver(post_save, sender=Runner)
+@receiver(post_delete, sender=Runner)
+@receiver(post_save, sender=TimelineEvent)
+@receiver(post_delete, sender=TimelineEvent)
+@receiver(post_save, sender=TimelineReference)
+@receiver(post_delete, sender=TimelineReference)
+@receiver(post_save, sender=Story)
+@receiver(post_delete, sender=Story)
+@receiver(post_save, sender=Reaction)
+@receiver(post_delete, sender=Reaction)
+@receiver(post_save, sender=Meme)
+@receiver(post_delete, sender=Meme)
+def catalog_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_model_versions(sender))
+
+
+@receiver(post_init, sender=Meme)
+@receiver(post_init, sender=Runner)
+def remember_image(sender, instance, **kwargs):
+    # Read the raw attributes: going through the descriptors would load
+    # deferred fields one query at a time.
+    image = instance.__dict__.get("image")
+    instance._stored_image = getattr(image, "name", image) or None
+    instance._stored_variants = instance.__dict__.get("variants")
+
+
+@receiver(post_save, sender=Meme)
+@receiver(post_save, sender=Runner)
+def image_saved(sender, instance, **kwargs):
+    name = instance.image.name or None
+    if name != instance._stored_image:
+        retain([name] if name else [])
+        release([instance._stored_image] + variant_names(instance._stored_variants))
+        if instance._stored_variants:
+            sender.objects.filter(pk=instance.pk).update(variants={})
+            instance.variants = {}
+        instance._stored_image = name
+        instance._stored_variants = instance.variants
+
+    if instance.image and instance.variants.get("source") != instance.image.name:
+        schedule_image_variants(instance)
+
+
+@receiver(post_delete, sender=Meme)
+@receiver(post_delete, sender=Runner)
+def image_deleted(sender, instance, **kwargs):
+    release([instance._stored_image] + variant_names(instance._stored_variants))
@@ -36,18 +36,39 @@ document.addEventListener("DOMContentLoaded", () => {
             headers["Content-Type"] = "application/json";
         return headers;
     }
+    // List endpoints are cursor-paginated; follow "next" until the last page.
+    async function fetchAllPages(url, headers) {
+        const items = [];
+        let next = `${url}${url.includes("?") ? "&" : "?"}paginate=cursor&page_size=100`;
+        let res;
+        while (next) {
+            res = await fetch(next, { headers });
+            if (!res.ok)
+                break;
+            const data = await res.json();
+            items.push(...data.results);
+            next = data.next;
+        }
+        return { res, items };
+    }
     // -------------------- SSE (votes) --------------------
+    // The stream opens with a full "snapshot" event; later messages carry only
+    // the runners whose counts changed.
     const sse = new EventSource(`${apiUrl}/vote/stream/`);
-    sse.onmessage = (e) => {
+    let voteMap = {};
+    function applyVoteEvent(e, replace) {
         try {
-            const voteMap = JSON.parse(e.data);
+            const counts = JSON.parse(e.data);
+            voteMap = replace ? counts : { ...voteMap, ...counts };
             const runnerList = convertSSEToRunnerList(voteMap);
             loadResults(runnerList);
         }
         catch (err) {
             console.error("Invalid SSE data:", err);
         }
-    };
+    }
+    sse.addEventListener("snapshot", (e) => applyVoteEvent(e, true));
+    sse.onmessage = (e) => applyVoteEvent(e, false);
     // -------------------- DOM helpers (typed) --------------------
     const timelineContainer = document.querySelector('.timeline');
     const searchBtn = document.getElementById("story-search-btn");
@@ -181,8 +202,7 @@ document.addEventListener("DOMContentLoaded", () => {
     // -------------------- Timeline references --------------------
     async function loadTimelineReferences() {
         try {
-            const eventsRes = await fetch(`${apiUrl}/timeline/`, { headers: authHeaders() });
-            const events = await eventsRes.json();
+            const { items: events } = await fetchAllPages(`${apiUrl}/timeline/`, authHeaders());
             const container = document.getElementById("timelineReferences");
             if (!container)
                 return;
@@ -253,7 +273,7 @@ document.addEventListener("DOMContentLoaded", () => {
                 headers: authHeaders(),
                 body: JSON.stringify({ runner: runnerId })
             });
-            if (response.status === 400) {
+            if (response.status === 409 || response.status === 400) {
                 if (message)
                     message.textContent = "You have already voted!";
                 return;
@@ -271,8 +291,7 @@ document.addEventListener("DOMContentLoaded", () => {
     // -------------------- Load timeline --------------------
     async function loadTimeline() {
         try {
-            const res = await fetch(`${apiUrl}/timeline/`, { headers: authHeaders() });
-            const events = await res.json();
+            const { items: events } = await fetchAllPages(`${apiUrl}/timeline/`, authHeaders());
             if (!timelineContainer)
                 return;
             timelineContainer.innerHTML = "";
@@ -412,6 +431,8 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     }
     // -------------------- Mileage form --------------------
+    // what the history table shows; new plans are prepended instead of refetching it
+    let mileageHistory = [];
     if (btnMil) {
         btnMil.addEventListener("click", async function () {
             if (!mileageForm)
@@ -437,10 +458,11 @@ document.addEventListener("DOMContentLoaded", () => {
                     console.error("Backend error:", resData);
                     return;
                 }
-                const historyRes = await fetch(`${apiUrl}/mileage/history/`, { headers: { Authorization: `Bearer ${token}` } });
-                const historyData = await historyRes.json();
-                renderMileageTable(historyData);
                 const latest = resData.latest;
+                if (latest) {
+                    mileageHistory = [latest, ...mileageHistory];
+                    renderMileageTable(mileageHistory);
+                }
                 if (resultMileage && latest) {
                     resultMileage.innerHTML = `
                     <p>You will reach your desired ${latest.desired_mileage} miles in approximately 
@@ -457,11 +479,13 @@ document.addEventListener("DOMContentLoaded", () => {
     // initial load for mileage history on window load
     window.addEventListener("load", async function () {
         try {
-            const res = await fetch(`${apiUrl}/mileage/history/`, { headers: { Authorization: `Bearer ${token}` } });
-            const data = await res.json();
+            const { items: data } = await fetchAllPages(`${apiUrl}/mileage/history/`, {
+                Authorization: `Bearer ${token}`
+            });
             if (!data.length)
                 return;
             const latest = data[0];
+            mileageHistory = data;
             renderMileageTable(data);
             if (resultMileage) {
                 resultMileage.innerHTML = `
@@ -483,10 +507,9 @@ document.addEventListener("DOMContentLoaded", () => {
                 params.append("age", ageFilter.value);
             if (sortOrder?.value)
                 params.append("sort", sortOrder.value);
-            const res = await fetch(`${apiUrl}/mileage/history/?${params.toString()}`, {
-                headers: { Authorization: `Bearer ${tokenLocal}` }
+            const { items: data } = await fetchAllPages(`${apiUrl}/mileage/history/?${params.toString()}`, {
+                Authorization: `Bearer ${tokenLocal}`
             });
-            const data = await res.json();
             renderMileageTable(data);
         }
         catch (err) {
@@ -646,8 +669,8 @@ document.addEventListener("DOMContentLoaded", () => {
             return;
         }
         try {
-            const res = await fetch(`${apiUrl}/stories/`, {
-                headers: { Authorization: `Bearer ${tokenLocal}` }
+            const { res, items: stories } = await fetchAllPages(`${apiUrl}/stories/`, {
+                Authorization: `Bearer ${tokenLocal}`
             });
             if (!res.ok) {
                 console.error("Failed to fetch stories:", res.status, res.statusText);
@@ -657,8 +680,6 @@ document.addEventListener("DOMContentLoaded", () => {
                     crazyContainer.textContent = "";
                 return;
             }
-            const data = await res.json();
-            const stories = Array.isArray(data) ? data : (data.results || []);
             renderStoriesArray(stories);
         }
         catch (err) {
@@ -735,18 +756,17 @@ document.addEventListener("DOMContentLoaded", () => {
             window.location.href = "/api/login/";
             return;
         }
-        fetch("http://127.0.0.1:8000/api/memes/", { headers: { Authorization: `Bearer ${tokenLocal}` } })
-            .then(res => {
+        fetchAllPages("http://127.0.0.1:8000/api/memes/", { Authorization: `Bearer ${tokenLocal}` })
+            .then(({ res, items }) => {
             if (res.status === 401) {
                 localStorage.clear();
                 window.location.href = "/api/login/";
+                return;
             }
-            return res.json();
-        })
-            .then((data) => {
-            memes = data.map(meme => ({
+            memes = items.map(meme => ({
                 id: meme.id,
                 url: meme.image,
+                srcset: meme.srcset?.webp ?? "",
                 category: meme.category
             }));
             currentPage = 1;
@@ -791,7 +811,7 @@ document.addEventListener("DOMContentLoaded", () => {
             galleryElement.classList.add("gallery-item");
             galleryElement.setAttribute("data-meme-id", String(m.id));
             galleryElement.innerHTML = `
-            <img src="${m.url}">
+            <img src="${m.url}" srcset="${m.srcset ?? ""}" sizes="(max-width: 600px) 100vw, 33vw" loading="lazy">
             ${isAdmin ? `<button class="delete-meme-btn" data-id="${m.id}">Delete</button>` : ""}
         `;
             galleryContainer.appendChild(galleryElement);
@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from .db_router import primary_reads
+from .models import Meme, MileageResult, Runner
+
+import logging
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "stats:snapshot"
+REFRESH_LOCK_KEY = "stats:refreshing"
+
+
+def compute_stats():
+    total_runners = Runner.objects.count()
+
+    top_runner = (
+        Runner.objects.filter(vote_count__gt=0)
+        .order_by('-vote_count')
+        .values('name', 'vote_count')
+        .first()
+    )
+    if top_runner:
+        most_voted_runner = top_runner['name']
+        top_votes = top_runner['vote_count']
+    else:
+        most_voted_runner = None
+        top_votes = 0
+
+    memes_by_category = list(
+        Meme.objects.values('category')
+        .annotate(count=Count('id'))
+        .order_by('-count')
+    )
+    total_memes = sum(item['count'] for item in memes_by_category)
+
+    if memes_by_category:
+        top_meme_category = memes_by_category[0]['category']
+        top_meme_count = memes_by_category[0]['count']
+    else:
+        top_meme_category = None
+        top_meme_count = 0
+
+    avg_mileage = MileageResult.objects.aggregate(
+        avg=Avg('desired_mileage')
+    )['avg']
+
+    return {
+        "total_runners": total_runners,
+        "most_voted_runner": most_voted_runner,
+        "top_votes": top_votes,
+
+        "total_memes": total_memes,
+        "memes_by_category": memes_by_category,
+        "top_meme_category": top_meme_category,
+        "top_meme_count": top_meme_count,
+
+        "average_desired_mileage": avg_mileage,
+    }
+
+
+def refresh_stats():
+    with primary_reads():
+        stats = compute_stats()
+    stats["generated_at"] = timezone.now().isoformat()
+    snapshot = (time.time(), stats)
+    cache.set(SNAPSHOT_KEY, snapshot, None)
+    return snapshot
+
+
+def get_stats():
+    """
+    Return the stats snapshot, recomputing it only when it is older than
+    STATS_MAX_AGE_SECONDS. While one request refreshes a stale snapshot the
+    others keep serving the old one, so the aggregates never run concurrently.
+    Run ``manage.py refresh_stats --interval N`` to refresh them off the
+    request path entirely.
+    """
+    max_age = getattr(settings, "STATS_MAX_AGE_SECONDS", 60)
+    snapshot = cache.get(SNAPSHOT_KEY)
+
+    if snapshot is None:
+        snapshot = refresh_stats()
+    elif time.time() - snapshot[0] > max_age and cache.add(REFRESH_LOCK_KEY, True, 30):
+        try:
+            snapshot = refresh_stats()
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+    return snapshot[1]
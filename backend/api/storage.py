@@ -0,0 +1,140 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+import logging
+logger = logging.getLogger(__name__)
+
+CAS_NAME_RE = re.compile(r"(^|/)cas/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$")
+
+
+def is_content_addressed(name):
+    return bool(name and CAS_NAME_RE.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every distinct file once, as ``<upload root>/cas/ab/<sha256>.<ext>``.
+
+    The content is hashed while it is streamed to a temporary file, which is
+    then renamed to its digest name, or dropped if that blob already exists.
+    Names never change meaning, so their URLs can be cached forever.
+    Blobs are shared between rows, so ``delete()`` is left to ``release()``,
+    which removes a blob once nothing references it.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Identical content must map to the same name, never to "name_x1y2".
+        return name
+
+    def blob_name(self, name, digest):
+        root = name.split("/", 1)[0] if "/" in name else ""
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(root, "cas", digest[:2], f"{digest}{extension}")
+
+    def _save(self, name, content):
+        directory = self.path("tmp")
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as tmp:
+            if hasattr(content, "seek"):
+                content.seek(0)
+            for chunk in content.chunks():
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        name = self.blob_name(name, digest.hexdigest())
+        path = self.path(name)
+        if os.path.exists(path):
+            os.remove(tmp.name)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp.name, path)
+            if self.file_permissions_mode is not None:
+                os.chmod(path, self.file_permissions_mode)
+        return name.replace("\\", "/")
+
+    def delete(self, name):
+        if not is_content_addressed(name):
+            super().delete(name)
+
+
+_storage = None
+
+
+def content_addressed_storage():
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage(location=settings.MEDIA_ROOT, base_url=settings.MEDIA_URL)
+    return _storage
+
+
+def retain(names):
+    """Add one reference to each content-addressed blob in ``names``."""
+    from .models import StoredBlob
+
+    for name in filter(is_content_addressed, names):
+        blob, created = StoredBlob.objects.get_or_create(
+            name=name, defaults={"refcount": 1, "size": _size(name)}
+        )
+        if not created:
+            StoredBlob.objects.filter(pk=blob.pk).update(refcount=F("refcount") + 1)
+
+
+def release(names):
+    """
+    Drop one reference to each blob in ``names``; blobs left unreferenced are
+    deleted from disk once the transaction commits.
+    """
+    from .models import StoredBlob
+
+    names = [name for name in names if is_content_addressed(name)]
+    if not names:
+        return
+    StoredBlob.objects.filter(name__in=names).update(refcount=F("refcount") - 1)
+
+    def remove_unreferenced():
+        storage = content_addressed_storage()
+        for name in names:
+            deleted, _ = StoredBlob.objects.filter(name=name, refcount__lte=0).delete()
+            if deleted and storage.exists(name):
+                os.remove(storage.path(name))
+                logger.info(f"Removed unreferenced blob {name}")
+
+    transaction.on_commit(remove_unreferenced)
+
+
+def discard(names):
+    """
+    Delete blobs in ``names`` that were written but never retained, once the
+    transaction commits. Blobs a row references (the same content stored for
+    it) are kept.
+    """
+    from .models import StoredBlob
+
+    names = [name for name in names if is_content_addressed(name)]
+    if not names:
+        return
+
+    def remove_unused():
+        storage = content_addressed_storage()
+        referenced = set(StoredBlob.objects.filter(name__in=names).values_list("name", flat=True))
+        for name in names:
+            if name not in referenced and storage.exists(name):
+                os.remove(storage.path(name))
+                logger.info(f"Removed unused blob {name}")
+
+    transaction.on_commit(remove_unused)
+
+
+def _size(name):
+    try:
+        return content_addressed_storage().size(name)
+    except OSError:
+        return 0
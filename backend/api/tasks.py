@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+from .images import process_image_variants
+
+_executor = None
+
+
+@shared_task(ignore_result=True)
+def generate_image_variants(model_label, pk):
+    process_image_variants(apps.get_model(model_label), pk)
+
+
+def schedule_image_variants(instance):
+    """
+    Queue variant generation for ``instance.image`` once the current
+    transaction commits. Uses Celery when IMAGE_PIPELINE is "celery" and a
+    small in-process thread pool otherwise, so uploads never wait for it.
+    """
+    model_label = instance._meta.label
+    pk = instance.pk
+
+    def dispatch():
+        global _executor
+        if getattr(settings, "IMAGE_PIPELINE", "thread") == "celery":
+            generate_image_variants.delay(model_label, pk)
+            return
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "IMAGE_PIPELINE_THREADS", 2),
+                thread_name_prefix="image-variants",
+            )
+        _executor.submit(process_image_variants, type(instance), pk)
+
+    transaction.on_commit(dispatch)
@@ -1,3 +1,789 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
 
 # Create your tests here.
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import connection, connections
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .authentication import _tokens, _users
+from .db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware, _read_primary
+from .images import generate_variants, process_image_variants, variant_names
+from .models import (
+    Meme, MileageResult, Quiz, Reaction, Runner, Story, StoredBlob, TimelineEvent, UploadSession, Vote,
+)
+from .query_plans import explain, hot_queries, plan_problems
+from .serializers import MyTokenObtainPairSerializer
+from .views import serve_media, votes_sse_stream
+from .vote_counts import VoteCountBuffer
+from .vote_stream import RedisBroker, get_stream_slots
+
+
+def bearer(user):
+    token = MyTokenObtainPairSerializer.get_token(user).access_token
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        _tokens.clear()
+        _users.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user("admin", password="pw", is_staff=True)
+        self.event = TimelineEvent.objects.create(year="2000", description="Sydney")
+
+    def delete_event(self, headers):
+        return self.client.delete(reverse("timeline-events-detail", args=[self.event.id]), **headers)
+
+    def test_demoted_admin_loses_access_once_the_user_cache_expires(self):
+        headers = bearer(self.admin)
+        self.assertEqual(self.client.get(reverse("user-me"), **headers).status_code, 200)
+
+        User.objects.filter(pk=self.admin.pk).update(is_staff=False)
+        _users.clear()
+
+        self.assertEqual(self.delete_event(headers).status_code, 403)
+        self.assertTrue(TimelineEvent.objects.filter(pk=self.event.pk).exists())
+
+    def test_deactivated_user_is_rejected(self):
+        headers = bearer(self.admin)
+        User.objects.filter(pk=self.admin.pk).update(is_staff=False, is_active=False)
+
+        self.assertEqual(self.delete_event(headers).status_code, 401)
+
+    def test_is_admin_claim_does_not_grant_staff(self):
+        user = User.objects.create_user("runner", password="pw")
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        token["is_admin"] = True
+
+        response = self.delete_event({"HTTP_AUTHORIZATION": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_user_state_is_read_once_per_token(self):
+        headers = bearer(self.admin)
+        self.client.get(reverse("user-me"), **headers)
+        # users/me reads username, a deferred field: one query for it, none
+        # for authentication.
+        with self.assertNumQueries(1):
+            self.client.get(reverse("user-me"), **headers)
+
+
+class StorySearchTests(TestCase):
+    def test_new_stories_are_searchable_after_migrating(self):
+        # Table rebuilds in later migrations must not leave the search index
+        # without its sync triggers.
+        user = User.objects.create_user("writer", password="pw")
+        story = Story.objects.create(author=user, content="Say hello to the marathon")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get(reverse("story-search"), {"q": "hello"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.data["results"]], [story.id])
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        for query in hot_queries():
+            with self.subTest(query.name):
+                plan = explain(query.queryset)
+                self.assertEqual(plan_problems(plan, query.seek), [], plan)
+
+
+class VoteStreamSlotTests(TestCase):
+    def test_slot_is_released_when_an_unread_stream_is_closed(self):
+        slots = get_stream_slots()
+        active = slots.active
+        for _ in range(3):
+            votes_sse_stream(RequestFactory().get("/api/vote/stream/")).close()
+        self.assertEqual(slots.active, active)
+
+    def test_slot_is_released_once_when_a_read_stream_is_closed(self):
+        slots = get_stream_slots()
+        active = slots.active
+        response = votes_sse_stream(RequestFactory().get("/api/vote/stream/"))
+        next(iter(response))
+        self.assertEqual(slots.active, active + 1)
+        response.close()
+        self.assertEqual(slots.active, active)
+
+
+class StopListening(Exception):
+    pass
+
+
+class RedisBrokerTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = mock.Mock()
+        redis = mock.Mock(RedisError=ConnectionError)
+        redis.Redis.from_url.return_value = self.redis
+        with mock.patch.dict("sys.modules", {"redis": redis}):
+            self.broker = RedisBroker("redis://localhost", "votes")
+
+    def test_publish_failure_is_logged_not_raised(self):
+        self.redis.publish.side_effect = ConnectionError("down")
+
+        with self.assertLogs("api.vote_stream", "ERROR"):
+            self.broker.publish({"runner": 1, "delta": 1})
+
+    def test_listener_reconnects_after_connection_error(self):
+        lost, restored = mock.Mock(), mock.Mock()
+        lost.listen.side_effect = ConnectionError("reset")
+        restored.listen.return_value = iter([{"data": b'{"runner": 1, "delta": 1}'}])
+        self.redis.pubsub.side_effect = [lost, restored]
+        received = []
+        self.broker._subscribers.append(received.append)
+
+        with mock.patch("api.vote_stream.time.sleep", side_effect=[None, StopListening]), \
+                self.assertLogs("api.vote_stream", "WARNING"), self.assertRaises(StopListening):
+            self.broker._listen()
+
+        self.assertEqual(received, [{"runner": 1, "delta": 1}])
+        lost.close.assert_called_once()
+        restored.close.assert_called_once()
+
+
+class StoryFeedQueryCountTests(TestCase):
+    def setUp(self):
+        self.users = User.objects.bulk_create(User(username=f"writer{i}") for i in range(20))
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def add_stories(self, count):
+        stories = Story.objects.bulk_create(
+            Story(author=self.users[i % len(self.users)], content=f"Story {i} about a marathon")
+            for i in range(count)
+        )
+        Reaction.objects.bulk_create(Reaction(user=user, story=stories[0]) for user in self.users)
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_flat(self, url, params):
+        self.add_stories(10)
+        # Warm up once: the search engine is picked (by introspection) on first use.
+        self.client.get(url, params)
+        small = self.count_queries(url, params)
+        self.add_stories(10_000 - 10)
+        with self.assertNumQueries(small):
+            self.client.get(url, params)
+
+    def test_story_feed_query_count_is_independent_of_table_size(self):
+        self.assert_flat(reverse("stories"), {})
+
+    def test_story_feed_page_query_count_is_independent_of_table_size(self):
+        self.assert_flat(reverse("stories"), {"paginate": "cursor"})
+
+    def test_story_search_query_count_is_independent_of_table_size(self):
+        self.assert_flat(reverse("story-search"), {"q": "marathon"})
+
+
+def run_concurrently(task, items, threads=16):
+    """Run ``task`` over ``items`` from a thread pool, each thread on its own connection."""
+    start = threading.Barrier(threads)
+
+    def run(chunk):
+        start.wait()
+        try:
+            return [task(item) for item in chunk]
+        finally:
+            connections.close_all()
+
+    chunks = [items[i::threads] for i in range(threads)]
+    with ThreadPoolExecutor(threads) as pool:
+        return [result for results in pool.map(run, chunks) for result in results]
+
+
+class ConcurrentVoteTests(TransactionTestCase):
+    voters = 40
+    attempts = 3
+
+    def setUp(self):
+        self.runners = [Runner.objects.create(name=f"Runner {i}") for i in range(3)]
+        self.users = [User.objects.create_user(f"voter{i}") for i in range(self.voters)]
+
+    def vote(self, attempt):
+        user, runner = attempt
+        client = APIClient()
+        client.force_authenticate(user)
+        return user.id, client.post(reverse("vote"), {"runner": runner.id}, format="json").status_code
+
+    def storm(self):
+        # Every voter double (triple) clicks, on different runners.
+        attempts = [
+            (user, self.runners[(i + n) % len(self.runners)])
+            for i, user in enumerate(self.users)
+            for n in range(self.attempts)
+        ]
+        results = run_concurrently(self.vote, attempts)
+
+        created = [user_id for user_id, status in results if status == 201]
+        self.assertEqual(sorted(created), sorted(user.id for user in self.users))
+        self.assertEqual(
+            sorted(status for _, status in results),
+            [201] * self.voters + [409] * (self.voters * (self.attempts - 1)),
+        )
+
+    def assert_counts_match_votes(self):
+        self.assertEqual(Vote.objects.count(), self.voters)
+        for runner in Runner.objects.all():
+            self.assertEqual(runner.vote_count, Vote.objects.filter(runner=runner).count(), runner.name)
+
+    def test_direct_mode_has_no_duplicate_or_lost_votes(self):
+        self.storm()
+        self.assert_counts_match_votes()
+
+    @override_settings(VOTE_INGEST_MODE="buffered")
+    def test_buffered_mode_has_no_duplicate_or_lost_votes(self):
+        # A buffer that only flushes when told to, so the check below can't
+        # race a background flush.
+        buffer = VoteCountBuffer(interval=3600, max_pending=10_000)
+        with mock.patch("api.vote_counts._buffer", buffer):
+            self.storm()
+            self.assertEqual(Runner.objects.filter(vote_count__gt=0).count(), 0)
+            buffer.flush()
+        self.assert_counts_match_votes()
+
+
+class ConcurrentReactionTests(TransactionTestCase):
+    def setUp(self):
+        author = User.objects.create_user("author")
+        self.stories = [Story.objects.create(author=author, content=f"Story {i}") for i in range(5)]
+        self.users = [User.objects.create_user(f"reader{i}") for i in range(30)]
+
+    def react(self, attempt):
+        user, kind = attempt
+        client = APIClient()
+        client.force_authenticate(user)
+        if kind == "bulk":
+            response = client.post(
+                reverse("story-react-bulk"), {"stories": [story.id for story in self.stories]}, format="json"
+            )
+        else:
+            response = client.post(reverse("story-react", args=[self.stories[kind].id]))
+        return response.status_code
+
+    def test_contended_reactions_are_counted_exactly_once(self):
+        # Each reader reacts to every story twice over: one at a time and in
+        # bulk, all at once with everyone else.
+        attempts = [(user, kind) for user in self.users for kind in [*range(len(self.stories)), "bulk"] * 2]
+        statuses = run_concurrently(self.react, attempts)
+
+        self.assertNotIn(500, statuses)
+        self.assertEqual(Reaction.objects.count(), len(self.users) * len(self.stories))
+        for story in Story.objects.all():
+            self.assertEqual(story.reactions_count, len(self.users))
+
+
+REPLICA = "replica_test"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], DB_REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The test database is the primary and the ``replica_test`` database from
+    settings is the replica. Both are migrated but nothing replicates between
+    them, so which one a read went to shows in what it returns.
+    """
+
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        self.user = User.objects.create_user("runner")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def history(self, client=None):
+        response = (client or self.client).get(reverse("mileage-history"))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def plan(self):
+        return self.client.post(
+            reverse("mileage"), {"age": "twentyforty", "injury": "no", "desiredMileage": 40}, format="json"
+        )
+
+    def test_router_reads_from_the_primary_outside_requests(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Runner), "default")
+        token = _read_primary.set(False)
+        try:
+            self.assertEqual(router.db_for_read(Runner), REPLICA)
+            self.assertEqual(router.db_for_write(Runner), "default")
+        finally:
+            _read_primary.reset(token)
+        self.assertFalse(router.allow_migrate(REPLICA, "api"))
+        self.assertTrue(router.allow_migrate("default", "api"))
+
+    def test_safe_requests_read_from_the_replica(self):
+        MileageResult.objects.create(
+            user=self.user, age="twentyforty", injury="no", desired_mileage=40, start_mileage=20, jump=4, weeks=5
+        )
+        self.assertEqual(self.history(), [])
+        self.assertEqual(MileageResult.objects.using(REPLICA).count(), 0)
+
+    def test_writes_go_to_the_primary_and_keep_the_writer_reading_it(self):
+        response = self.plan()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+        self.assertEqual(MileageResult.objects.using("default").count(), 1)
+        self.assertEqual(MileageResult.objects.using(REPLICA).count(), 0)
+        # The writer sees its own plan; another client still reads the replica.
+        self.assertEqual(len(self.history()), 1)
+        other = APIClient()
+        other.force_authenticate(self.user)
+        self.assertEqual(self.history(other), [])
+
+    def test_stickiness_ends_with_the_window(self):
+        self.plan()
+        self.client.cookies[ReplicaRoutingMiddleware.cookie_name] = str(int(time.time() - 1))
+        self.assertEqual(self.history(), [])
+
+    def test_failed_writes_do_not_stick(self):
+        response = self.client.post(reverse("mileage"), {"age": "unknown"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+
+    def test_version_keyed_caches_are_filled_from_the_primary(self):
+        # The write bumps the change counters at once; a lagging replica read
+        # must not be cached, or given an ETag, as the new version.
+        Runner.objects.create(name="Fresh")
+        Quiz.objects.create(title="Fresh quiz")
+
+        runners = self.client.get(reverse("runner-list"))
+        quizzes = self.client.get(reverse("quiz-list"))
+
+        self.assertIn("Fresh", [runner["name"] for runner in runners.data])
+        self.assertIn("Fresh quiz", [quiz["title"] for quiz in quizzes.data])
+        self.assertEqual(self.client.get(reverse("runner-list"), HTTP_IF_NONE_MATCH=runners["ETag"]).status_code, 304)
+
+
+class QuizSubmissionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("quizzer"))
+        # Run the signals' cache invalidation, as committing would.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz = Quiz.objects.create(title="Marathon", has_correct_answers=True)
+            distance = self.quiz.questions.create(text="How long is a marathon?")
+            self.right = distance.answers.create(text="42.195 km", is_correct=True)
+            self.wrong = distance.answers.create(text="40 km")
+            self.record = self.quiz.questions.create(text="Who holds the record?").answers.create(
+                text="Kiptum", is_correct=True
+            )
+            other = Quiz.objects.create(title="Other")
+            self.foreign = other.questions.create(text="Favourite shoe?").answers.create(text="Any")
+
+    def submit(self, answers):
+        return self.client.post(reverse("quiz-submit"), {"quiz": self.quiz.id, "answers": answers}, format="json")
+
+    def test_scores_a_submission(self):
+        response = self.submit([self.right.id, self.record.id])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"quiz": self.quiz.id, "score": 2, "total": 2, "passed": True})
+
+        response = self.submit([self.wrong.id, self.record.id])
+        self.assertEqual(response.data, {"quiz": self.quiz.id, "score": 1, "total": 2, "passed": False})
+
+    def test_rejects_an_answer_from_another_quiz(self):
+        response = self.submit([self.right.id, self.foreign.id])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"answers": [f"Answer {self.foreign.id} does not belong to this quiz."]})
+
+    def test_rejects_several_answers_to_one_question(self):
+        # Otherwise picking every answer would score full marks.
+        response = self.submit([self.right.id, self.wrong.id, self.record.id])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data, {"answers": [f"More than one answer given for question {self.right.question_id}."]}
+        )
+
+    def test_batch_scores_each_submission_on_its_own(self):
+        submissions = [
+            {"quiz": self.quiz.id, "answers": [self.right.id, self.record.id]},
+            {"quiz": self.quiz.id, "answers": [self.foreign.id]},
+            {"quiz": 0, "answers": []},
+            {"quiz": self.quiz.id, "answers": [self.wrong.id]},
+        ]
+        response = self.client.post(reverse("quiz-submit-batch"), {"submissions": submissions}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"quiz": self.quiz.id, "score": 2, "total": 2, "passed": True},
+                {"quiz": self.quiz.id, "errors": [f"Answer {self.foreign.id} does not belong to this quiz."]},
+                {"quiz": 0, "error": "Quiz not found"},
+                {"quiz": self.quiz.id, "score": 0, "total": 2, "passed": False},
+            ],
+        )
+
+    def test_answer_key_follows_an_answer_edit(self):
+        self.assertEqual(self.submit([self.wrong.id, self.record.id]).data["score"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.wrong.is_correct = True
+            self.wrong.save()
+            self.right.is_correct = False
+            self.right.save()
+
+        self.assertEqual(self.submit([self.wrong.id, self.record.id]).data["score"], 2)
+        self.assertEqual(self.submit([self.right.id, self.record.id]).data["score"], 1)
+
+
+class MileageSyncTokenTests(TestCase):
+    plan = {"age": "twentyforty", "injury": "no", "desiredMileage": 40}
+
+    def setUp(self):
+        self.user = User.objects.create_user("runner")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=""):
+        return self.client.get(reverse("mileage-history"), {"since": since}).data
+
+    def post(self, since=None):
+        query = f"?since={since}" if since is not None else ""
+        return self.client.post(reverse("mileage") + query, self.plan, format="json")
+
+    def test_no_token_without_the_client_cursor(self):
+        response = self.post()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("sync_token", response.data)
+
+    def test_token_advances_past_the_new_plan_when_nothing_else_is_unseen(self):
+        since = self.sync()["sync_token"]
+
+        response = self.post(since)
+
+        self.assertNotEqual(response.data["sync_token"], since)
+        self.assertEqual(self.sync(response.data["sync_token"])["results"], [])
+
+    def test_token_stays_put_when_other_plans_were_created_meanwhile(self):
+        since = self.sync()["sync_token"]
+        other_device = APIClient()
+        other_device.force_authenticate(self.user)
+        other_device.post(reverse("mileage"), self.plan, format="json")
+
+        response = self.post(since)
+
+        self.assertEqual(response.data["sync_token"], since)
+        self.assertEqual(len(self.sync(since)["results"]), 2)
+
+    def test_invalid_cursor_is_rejected_before_saving(self):
+        response = self.post("not-a-token")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MileageResult.objects.exists())
+
+
+def png_bytes(size=(8, 8)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 10, 10)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class MediaRootTestMixin:
+    """Point MEDIA_ROOT, the upload directory and the media storage at a temporary directory."""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, CHUNKED_UPLOAD_DIR=os.path.join(self.media_root, "tmp", "uploads")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        storage = Meme._meta.get_field("image").storage
+        patcher = mock.patch.object(storage, "location", self.media_root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ChunkedUploadTests(MediaRootTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("uploader")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = png_bytes()
+
+    def start(self, content_type="image/png", filename="evil.html"):
+        response = self.client.post(
+            reverse("upload-create"),
+            {"kind": "meme", "filename": filename, "content_type": content_type, "size": len(self.data)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data["id"]
+
+    def put(self, upload_id, chunk, offset):
+        return self.client.put(
+            reverse("upload-chunk", args=[upload_id]), chunk,
+            content_type="application/octet-stream", HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def finalize(self, upload_id, sha256=None):
+        sha256 = sha256 or hashlib.sha256(self.data).hexdigest()
+        return self.client.post(reverse("upload-finalize", args=[upload_id]), {"sha256": sha256, "title": "Chunked"}, format="json")
+
+    def test_upload_in_chunks_then_finalize(self):
+        upload_id = self.start()
+
+        self.assertEqual(self.put(upload_id, self.data[:20], 0).data["offset"], 20)
+        self.assertEqual(self.put(upload_id, self.data[20:], 20).data["offset"], len(self.data))
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 201)
+        meme = Meme.objects.get()
+        # The stored name takes its extension from the verified type, never from the client.
+        self.assertTrue(meme.image.name.endswith(".png"), meme.image.name)
+        with meme.image.open("rb") as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_chunk_at_the_wrong_offset_conflicts(self):
+        upload_id = self.start()
+
+        response = self.put(upload_id, self.data[20:], 20)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(reverse("upload-chunk", args=[upload_id])).data["offset"], 0)
+
+    def test_content_not_matching_the_declared_type_is_rejected(self):
+        upload_id = self.start(content_type="image/jpeg")
+
+        response = self.put(upload_id, self.data, 0)
+
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_checksum_mismatch_is_rejected(self):
+        upload_id = self.start()
+        self.put(upload_id, self.data, 0)
+
+        response = self.finalize(upload_id, sha256="0" * 64)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("sha256", response.data)
+        self.assertFalse(Meme.objects.exists())
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        upload_id = self.start()
+        self.put(upload_id, self.data[:20], 0)
+
+        self.assertEqual(self.finalize(upload_id).status_code, 409)
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=(320,), IMAGE_VARIANT_FORMATS=("webp", "jpeg"))
+@mock.patch("api.images.close_old_connections")
+class ImageVariantTests(MediaRootTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.runner = Runner.objects.create(name="Runner", image=ContentFile(png_bytes((640, 320)), name="runner.png"))
+
+    def refcounts(self, names):
+        return dict(StoredBlob.objects.filter(name__in=names).values_list("name", "refcount"))
+
+    def test_repeated_job_for_the_same_image_retains_its_variants_once(self, close_old_connections):
+        with self.captureOnCommitCallbacks(execute=True):
+            process_image_variants(Runner, self.runner.pk)
+            process_image_variants(Runner, self.runner.pk)
+
+        self.runner.refresh_from_db()
+        names = variant_names(self.runner.variants)
+        self.assertEqual(len(names), 2)
+        self.assertEqual(self.refcounts(names), {name: 1 for name in names})
+
+    def test_variants_of_an_image_replaced_meanwhile_are_discarded(self, close_old_connections):
+        generated = []
+
+        def generate_then_replace(field_file):
+            variants = generate_variants(field_file)
+            generated.extend(variant_names(variants))
+            Runner.objects.filter(pk=self.runner.pk).update(image="runners/other.png")
+            return variants
+
+        with mock.patch("api.images.generate_variants", side_effect=generate_then_replace):
+            with self.captureOnCommitCallbacks(execute=True):
+                process_image_variants(Runner, self.runner.pk)
+
+        self.assertEqual(len(generated), 2)
+        storage = Runner._meta.get_field("image").storage
+        self.assertFalse([name for name in generated if storage.exists(name)])
+        self.assertEqual(self.refcounts(generated), {})
+        self.runner.refresh_from_db()
+        self.assertEqual(self.runner.variants, {})
+
+
+class ServeMediaTests(MediaRootTestMixin, SimpleTestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.media_root, "memes"))
+        with open(os.path.join(self.media_root, "memes", "photo.jpg"), "wb") as f:
+            f.write(self.content)
+
+    def get(self, path="memes/photo.jpg", **headers):
+        response = serve_media(RequestFactory().get("/", **headers), path)
+        body = b"".join(response) if response.status_code in (200, 206) else b""
+        response.close()
+        return response, body
+
+    def test_full_download(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+
+    def test_ranges_get_partial_content(self):
+        ranges = [
+            ("bytes=100-199", 100, 199),
+            ("bytes=1000-", 1000, 1023),
+            ("bytes=-24", 1000, 1023),
+            ("bytes=1000-5000", 1000, 1023),
+        ]
+        for header, start, end in ranges:
+            with self.subTest(header):
+                response, body = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(body, self.content[start:end + 1])
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/1024")
+
+    def test_unsatisfiable_ranges_get_416(self):
+        for header in ["bytes=1024-", "bytes=200-100", "bytes=-0"]:
+            with self.subTest(header):
+                response, _ = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_ignored_ranges_get_the_whole_file(self):
+        for header in ["bytes=0-1,5-6", "items=0-1", "bytes=-"]:
+            with self.subTest(header):
+                response, body = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(body, self.content)
+
+    def test_revalidation_gets_304(self):
+        first, _ = self.get()
+        for headers in [{"HTTP_IF_NONE_MATCH": first["ETag"]}, {"HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]}]:
+            with self.subTest(headers):
+                response, _ = self.get(**headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], first["ETag"])
+
+    def test_if_range_only_resumes_the_same_version(self):
+        etag = self.get()[0]["ETag"]
+
+        response, body = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[:10])
+
+        response, body = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_paths_outside_media_or_in_tmp_are_not_found(self):
+        outside = tempfile.NamedTemporaryFile(dir=os.path.dirname(self.media_root))
+        self.addCleanup(outside.close)
+        os.makedirs(os.path.join(self.media_root, "tmp"))
+        open(os.path.join(self.media_root, "tmp", "part"), "wb").close()
+
+        paths = [f"../{os.path.basename(outside.name)}", "memes/../../etc/passwd", "tmp/part", "memes", "missing.jpg"]
+        for path in paths:
+            with self.subTest(path), self.assertRaises(Http404):
+                self.get(path)
+
+    def test_sendfile_headers_are_url_quoted(self):
+        name = "memes/naïve 100%?.jpg"
+        with open(os.path.join(self.media_root, name), "wb") as f:
+            f.write(self.content)
+
+        with override_settings(MEDIA_SENDFILE_BACKEND="nginx"):
+            response, _ = self.get(name)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/memes/na%C3%AFve%20100%25%3F.jpg")
+
+        with override_settings(MEDIA_SENDFILE_BACKEND="apache"):
+            response, _ = self.get(name)
+        self.assertEqual(response["X-Sendfile"], quote(os.path.join(self.media_root, name)))
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reader")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Story.objects.bulk_create(Story(author=self.user, content=f"Story {i}") for i in range(130))
+
+    def test_legacy_shape_returns_the_whole_list(self):
+        response = self.client.get(reverse("stories"))
+
+        self.assertEqual(len(response.data), 130)
+
+    def test_following_next_visits_every_row_once(self):
+        seen, url = [], reverse("stories") + "?paginate=cursor&page_size=40"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [story["id"] for story in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(seen, list(Story.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+
+    def test_malformed_cursors_are_not_found(self):
+        ordering = ["-created_at", "-id"]
+        for cursor in (
+            "!!!",
+            raw_cursor(["abc", 1]),
+            raw_cursor({"o": ordering, "p": ["abc", 1]}),
+            raw_cursor({"o": ordering, "p": [{"a": 1}, 1]}),
+            raw_cursor({"o": ordering, "p": [None, None]}),
+            raw_cursor({"o": ordering, "p": ["2026-01-01T00:00:00+00:00", "x"]}),
+            raw_cursor({"o": ordering, "p": "ab"}),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(reverse("stories"), {"cursor": cursor}).status_code, 404)
+
+    def test_cursor_for_another_sort_is_not_found(self):
+        for desired in (30, 40, 50):
+            MileageResult.objects.create(
+                user=self.user, age="twentyforty", injury="no", desired_mileage=desired, start_mileage=20, jump=4, weeks=5
+            )
+        url = reverse("mileage-history")
+        next_link = self.client.get(url, {"sort": "asc", "paginate": "cursor", "page_size": 1}).data["next"]
+        cursor = next_link.split("cursor=")[1].split("&")[0]
+
+        self.assertEqual(self.client.get(url, {"sort": "asc", "cursor": cursor}).status_code, 200)
+        self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 404)
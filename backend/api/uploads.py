@@ -0,0 +1,100 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.http import UnreadablePostError
+from PIL import Image
+
+import logging
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 64 * 1024
+
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+# The only extension a finalized upload is stored under, whatever the client
+# called the file: media is served with the type its extension implies.
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+def sniff_content_type(head):
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def stored_filename(session):
+    return f"{session.pk}{EXTENSIONS[session.content_type]}"
+
+
+def part_path(session):
+    directory = settings.CHUNKED_UPLOAD_DIR
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{session.pk}.part")
+
+
+def write_chunk(session, stream, offset, length):
+    """
+    Copy ``length`` bytes of ``stream`` into the session's part file at
+    ``offset`` in fixed-size blocks, so memory stays bounded whatever the
+    chunk size. Returns the number of bytes written; if the client drops
+    mid-chunk the bytes that did arrive are kept for the next attempt.
+    """
+    path = part_path(session)
+    written = 0
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.seek(offset)
+        f.truncate()
+        try:
+            while written < length:
+                block = stream.read(min(READ_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                written += len(block)
+        except (OSError, UnreadablePostError):
+            logger.info(f"Upload {session.pk} interrupted after {offset + written} bytes")
+    return written
+
+
+def read_head(session, size=16):
+    with open(part_path(session), "rb") as f:
+        return f.read(size)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_valid_image(path):
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        return False
+    return True
+
+
+def discard(session):
+    path = part_path(session)
+    if os.path.exists(path):
+        os.remove(path)
+    session.delete()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from . import views
-from .views import Register, Login, ProtectedView, MemeListCreateView, MemeDetailView, RunnerListView, RunnerManageView, VoteCreateView, RunnerCreateView, CurrentUserView, QuizRunnersView, QuizListView, QuizDetailView, QuizSubmitView, StoryListCreateView, StoryDeleteView, ReactionCreateView, UserWebsiteRatingView, TimelineEventListView, TimelineEventManageView,  TimelineReferenceViewSet, TimelineReferencePublicList, MyTokenObtainPairView, MyTokenRefreshView, MileageResultView, MileageHistoryView, StorySearchView
+from .views import Register, Login, ProtectedView, MemeListCreateView, MemeDetailView, RunnerListView, RunnerManageView, VoteCreateView, RunnerCreateView, CurrentUserView, QuizRunnersView, QuizListView, QuizDetailView, QuizSubmitView, QuizBatchSubmitView, StoryListCreateView, StoryDeleteView, ReactionCreateView, BulkReactionView, UserWebsiteRatingView, TimelineEventListView, TimelineEventManageView,  TimelineReferenceViewSet, TimelineReferencePublicList, MyTokenObtainPairView, MyTokenRefreshView, MileageResultView, MileageBatchView, MileageHistoryView, StorySearchView
 from .views import VoteCreateView, votes_sse_stream
 
 from rest_framework_simplejwt.views import (
@@ -43,8 +43,10 @@ urlpatterns = [
     path("quizzes/", QuizListView.as_view(), name="quiz-list"),
     path("quizzes/<int:pk>/", QuizDetailView.as_view(), name="quiz-detail"),
     path("quizzes/submit/", QuizSubmitView.as_view(), name="quiz-submit"),
+    path("quizzes/submit/batch/", QuizBatchSubmitView.as_view(), name="quiz-submit-batch"),
     path("stories/", StoryListCreateView.as_view(), name="stories"),
     path("stories/<int:story_id>/react/", ReactionCreateView.as_view(), name="story-react"),
+    path("stories/react/bulk/", BulkReactionView.as_view(), name="story-react-bulk"),
     path("stories/<int:pk>/delete/", StoryDeleteView.as_view(), name="story-delete"),
     path("stories/search/", StorySearchView.as_view(), name="story-search"),
     path("website-rating/", UserWebsiteRatingView.as_view(), name="website-rating"),
@@ -52,9 +54,13 @@ urlpatterns = [
     path("", include(router.urls)),
     path("events/<int:event_id>/references/", TimelineReferencePublicList.as_view()),
     path("mileage/", MileageResultView.as_view(), name="mileage"),
+    path("mileage/batch/", MileageBatchView.as_view(), name="mileage-batch"),
     path("mileage/history/", MileageHistoryView.as_view(), name="mileage-history"),
     path("metrics/", exports.ExportToDjangoView, name="django-metrics"),
     path("stats/", views.stats_dashboard, name="stats-dashboard"),
+    path("uploads/", views.UploadCreateView.as_view(), name="upload-create"),
+    path("uploads/<uuid:pk>/", views.UploadChunkView.as_view(), name="upload-chunk"),
+    path("uploads/<uuid:pk>/finalize/", views.UploadFinalizeView.as_view(), name="upload-finalize"),
 
 ]
 
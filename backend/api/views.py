@@ -1,18 +1,29 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Count, Avg
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 from rest_framework import status, generics, permissions
 from django.contrib.auth import authenticate
-from rest_framework.exceptions import ValidationError 
+from rest_framework.exceptions import NotFound, UnsupportedMediaType, ValidationError
+from .exceptions import Conflict, PayloadTooLarge
+from django.core.files import File
+from django.shortcuts import get_object_or_404
+from rest_framework.utils.urls import replace_query_param
 from django.contrib.auth.models import User
 from rest_framework import viewsets
 
-from .serializers import MyTokenRefreshSerializer, UserSerializer, MemeSerializer, RunnerSerializer, VoteSerializer, RunnerCreateSerializer, QuizSerializer, QuizSubmitSerializer, StorySerializer, ReactionSerializer, WebsiteRatingSerializer, TimelineEventSerializer, TimelineReferenceSerializer, MyTokenObtainPairSerializer, MileageResultSerializer, MileageInputSerializer
-from .models import Meme, Runner, Vote, Quiz, Answer, Story, Reaction, WebsiteRating, TimelineEvent, TimelineReference, MileageResult
-from rest_framework_simplejwt.tokens import RefreshToken
+from .serializers import MyTokenRefreshSerializer, UserSerializer, MemeSerializer, RunnerSerializer, VoteSerializer, RunnerCreateSerializer, QuizSerializer, QuizSubmitSerializer, QuizBatchSubmitSerializer, StorySerializer, ReactionSerializer, BulkReactionSerializer, WebsiteRatingSerializer, TimelineEventSerializer, TimelineReferenceSerializer, MyTokenObtainPairSerializer, MileageResultSerializer, MileageInputSerializer, MileageBatchSerializer, UploadSessionSerializer, UploadFinalizeSerializer
+from .models import Meme, Runner, Vote, Quiz, Answer, Story, Reaction, WebsiteRating, TimelineEvent, TimelineReference, MileageResult, UploadSession
 from rest_framework.permissions import IsAuthenticated
 from .permissions import IsOwnerOrAdmin
+from .pagination import KeysetPagination
+from .caching import CachedListMixin, ConditionalListMixin
+from .quiz_cache import get_answer_key, get_quiz_document, get_quiz_list
+from .stats import get_stats
+from .mileage import decode_sync_token, encode_sync_token, plan_batches, plan_for
+from .reactions import add_reactions
+from .uploads import discard, file_sha256, is_valid_image, part_path, read_head, sniff_content_type, stored_filename, write_chunk
+from .search import decode_page_token, encode_page_token, get_search_engine, highlight
 from rest_framework.permissions import IsAdminUser
 from django.shortcuts import render
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -21,11 +32,20 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from django.db.models import Q
-
+import asyncio
 import json
-import time
-from django.http import StreamingHttpResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+import mimetypes
+import os
+from urllib.parse import quote
+from .media import iter_file_range, media_cache_control, parse_range
+from .vote_stream import delta_event, get_stream_slots, get_vote_tally, snapshot_event
 
 import logging
 logger = logging.getLogger(__name__)
@@ -63,7 +83,7 @@ class Register(APIView):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = MyTokenObtainPairSerializer.get_token(user)
             return Response({
                 "message": "User created successfully",
                 "refresh": str(refresh),
@@ -81,7 +101,7 @@ class Login(APIView):
         logger.info(f"Login attempt for username={request.data.get('username')}")
         user = authenticate(username=username, password=password)
         if user:
-            refresh = RefreshToken.for_user(user)
+            refresh = MyTokenObtainPairSerializer.get_token(user)
             return Response({
                 "message": "Login successful",
                 "refresh": str(refresh),
@@ -92,10 +112,12 @@ class Login(APIView):
         return Response({"error": "Invalid username or password"}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MemeListCreateView(generics.ListCreateAPIView):
+class MemeListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     queryset = Meme.objects.all().order_by('-created_at')
     serializer_class = MemeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    validator_models = (Meme,)
 
     def perform_create(self, serializer):
         logger.info(f"New meme being created by user {self.request.user.id}")
@@ -108,9 +130,10 @@ class MemeDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 
-class RunnerListView(generics.ListAPIView):
+class RunnerListView(ConditionalListMixin, CachedListMixin, generics.ListAPIView):
     queryset = Runner.objects.all()
     serializer_class = RunnerSerializer
+    cache_models = validator_models = (Runner,)
 
 class RunnerManageView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Runner.objects.all()
@@ -125,10 +148,14 @@ class VoteCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         user = self.request.user
         logger.info(f"Vote attempt by user {self.request.user.id}")
-        if Vote.objects.filter(user=user).exists():
+        # Insert and let the unique user constraint reject a second vote, so
+        # two concurrent requests can't both pass a separate exists() check.
+        try:
+            with transaction.atomic():
+                serializer.save(user=user)
+        except IntegrityError:
             logger.warning(f"User {self.request.user.id} tried to vote twice")
-            raise ValidationError("You have already voted.")
-        serializer.save(user=user)
+            raise Conflict("You have already voted.")
         logger.info(f"Vote recorded for user {self.request.user.id}")
 
 class RunnerCreateView(generics.CreateAPIView):
@@ -137,8 +164,9 @@ class RunnerCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
-class QuizRunnersView(generics.ListAPIView):
+class QuizRunnersView(CachedListMixin, generics.ListAPIView):
     serializer_class = RunnerSerializer
+    cache_models = (Runner,)
 
     def get_queryset(self):
         return Runner.objects.filter(is_quiz_runner=True).order_by("quiz_order")
@@ -147,50 +175,76 @@ class QuizListView(generics.ListAPIView):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
 
+    def list(self, request, *args, **kwargs):
+        return Response(get_quiz_list())
+
 class QuizDetailView(generics.RetrieveAPIView):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        document = get_quiz_document(kwargs["pk"])
+        if document is None:
+            raise NotFound()
+        return Response(document)
+
 class QuizSubmitView(APIView):
-    
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        permission_classes = [IsAuthenticated]
         serializer = QuizSubmitSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         quiz_id = serializer.validated_data["quiz"]
         selected_answers = serializer.validated_data["answers"]
         logger.info(f"Quiz submission by user {request.user.id}: {request.data}")
-        try:
-            quiz = Quiz.objects.get(id=quiz_id)
-        except Quiz.DoesNotExist:
+
+        answer_key = get_answer_key(quiz_id)
+        if answer_key is None:
             return Response({"error": "Quiz not found"}, status=404)
 
-        if quiz.has_correct_answers:
-            correct_count = Answer.objects.filter(
-                id__in=selected_answers,
-                is_correct=True
-            ).count()
+        errors = answer_key.validate(selected_answers)
+        if errors:
+            return Response({"answers": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-            total = quiz.questions.count()
+        return Response(answer_key.score(selected_answers))
 
-            return Response({
-                "quiz": quiz.id,
-                "score": correct_count,
-                "total": total,
-                "passed": correct_count == total
-            })
+class QuizBatchSubmitView(APIView):
+    """Score many quiz submissions in one request, e.g. a whole classroom."""
+    permission_classes = [IsAuthenticated]
 
-        else:
-            return Response({
-                "quiz": quiz.id,
-                "result": selected_answers
-            })
+    def post(self, request):
+        serializer = QuizBatchSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-class StoryListCreateView(generics.ListCreateAPIView):
-    queryset = Story.objects.all().order_by("-created_at")
+        submissions = serializer.validated_data["submissions"]
+        logger.info(f"Batch quiz submission by user {request.user.id}: {len(submissions)} submissions")
+
+        answer_keys = {}
+        results = []
+        for submission in submissions:
+            quiz_id = submission["quiz"]
+            if quiz_id not in answer_keys:
+                answer_keys[quiz_id] = get_answer_key(quiz_id)
+            answer_key = answer_keys[quiz_id]
+
+            if answer_key is None:
+                results.append({"quiz": quiz_id, "error": "Quiz not found"})
+                continue
+            errors = answer_key.validate(submission["answers"])
+            if errors:
+                results.append({"quiz": quiz_id, "errors": errors})
+                continue
+            results.append(answer_key.score(submission["answers"]))
+
+        return Response({"results": results})
+
+class StoryListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
+    queryset = Story.objects.for_feed().order_by("-created_at")
     serializer_class = StorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    validator_models = (Story, Reaction)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -205,16 +259,37 @@ class ReactionCreateView(generics.CreateAPIView):
 
     def create(self, request, *args, **kwargs):
         story_id = kwargs.get("story_id")
-        story = Story.objects.get(id=story_id)
+        inserted = add_reactions(request.user.id, [story_id])
 
-        if Reaction.objects.filter(user=request.user, story=story).exists():
+        if not inserted:
+            if not Story.objects.filter(id=story_id).exists():
+                raise NotFound("Story not found.")
             return Response({"detail": "You already reacted to this story."},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        reaction = Reaction.objects.create(user=request.user, story=story)
+        reaction_id, story_id, created_at = inserted[0]
+        reaction = Reaction(id=reaction_id, user=request.user, story_id=story_id, created_at=created_at)
         serializer = self.get_serializer(reaction)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+class BulkReactionView(APIView):
+    """React to several stories at once; stories already reacted to are skipped."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkReactionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        story_ids = set(serializer.validated_data["stories"])
+
+        created = {story_id for _, story_id, _ in add_reactions(request.user.id, story_ids)}
+        existing = set(Story.objects.filter(id__in=story_ids - created).values_list("id", flat=True))
+
+        return Response({
+            "created": sorted(created),
+            "already_reacted": sorted(existing),
+            "missing": sorted(story_ids - created - existing),
+        })
+
 class UserWebsiteRatingView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -232,9 +307,12 @@ class UserWebsiteRatingView(APIView):
         return Response(serializer.errors, status=400)
 
 
-class TimelineEventListView(generics.ListAPIView):
-    queryset = TimelineEvent.objects.all()
+class TimelineEventListView(ConditionalListMixin, CachedListMixin, generics.ListAPIView):
+    queryset = TimelineEvent.objects.prefetch_related("references")
     serializer_class = TimelineEventSerializer
+    cache_models = validator_models = (TimelineEvent, TimelineReference)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("order", "year", "id")
 
 class TimelineEventManageView(viewsets.ModelViewSet):
     queryset = TimelineEvent.objects.all()
@@ -246,8 +324,9 @@ class TimelineReferenceViewSet(viewsets.ModelViewSet):
     serializer_class = TimelineReferenceSerializer
     permission_classes = [IsAdminUser]
 
-class TimelineReferencePublicList(generics.ListAPIView):
+class TimelineReferencePublicList(CachedListMixin, generics.ListAPIView):
     serializer_class = TimelineReferenceSerializer
+    cache_models = (TimelineReference,)
 
     def get_queryset(self):
         event_id = self.kwargs["event_id"]
@@ -281,6 +360,12 @@ class MileageResultView(APIView):
             )
             return Response(input_serializer.errors, status=400)
 
+        # A client that syncs mileage/history/ passes its own cursor as
+        # ?since=; see sync_token_after below.
+        since = request.query_params.get("since")
+        if since and decode_sync_token(since) is None:
+            return Response({"since": "Invalid sync token."}, status=400)
+
         try:
             age = request.data.get("age")
             injury = request.data.get("injury")
@@ -298,21 +383,7 @@ class MileageResultView(APIView):
             logger.info(
                 f"Valid input for user {request.user.id}: age={age}, injury={injury}, desired={desired}"
             )
-            if age == "twentyless":
-                jump = 3 if injury == "yes" else 4
-                start = 20 if injury == "yes" else 25
-                desired = min(desired, 70)
-            elif age == "fiftymore":
-                jump = 2 if injury == "yes" else 3
-                start = 15 if injury == "yes" else 20
-                desired = min(desired, 50)
-            else:
-                jump = 3 if injury == "yes" else 4
-                start = 20
-
-            start = min(start, desired)
-
-            weeks = max(0, round((desired - start) / jump))
+            start, jump, weeks, desired = plan_for(age, injury, desired)
             logger.info(
                 f"Mileage calculated for user {request.user.id}: start={start}, "
                 f"jump={jump}, weeks={weeks}, final_desired={desired}"
@@ -331,13 +402,20 @@ class MileageResultView(APIView):
             logger.info(f"Mileage result saved for user {request.user.id}, id={result.id}")
 
             serializer = MileageResultSerializer(result)
-            history = MileageResult.objects.filter(user=request.user).order_by("-created_at")
-            history_serializer = MileageResultSerializer(history, many=True)
+            data = {"latest": serializer.data}
+            if since is not None:
+                data["sync_token"] = self.sync_token_after(request.user, since, result)
 
-            return Response({
-                "latest": serializer.data,
-                "history": history_serializer.data
-            }, status=201)
+            # The old response shape, kept for clients that haven't moved to
+            # mileage/history/?since=<sync_token> yet; now bounded.
+            if request.query_params.get("include_history") in ("1", "true"):
+                history = (
+                    MileageResult.objects.filter(user=request.user)
+                    .order_by("-created_at", "-id")[:settings.MILEAGE_HISTORY_MAX_ENTRIES]
+                )
+                data["history"] = MileageResultSerializer(history, many=True).data
+
+            return Response(data, status=201)
 
         except Exception as e:
             logger.error(
@@ -346,116 +424,355 @@ class MileageResultView(APIView):
             )
             return Response({"error": "Internal server error"}, status=500)
 
+    def sync_token_after(self, user, since, result):
+        """
+        The client's cursor advanced past ``result`` if that is the only entry
+        it has not seen, otherwise ``since`` unchanged: a token pointing at
+        ``result`` would make the next sync skip plans the user created
+        meanwhile elsewhere (another tab or device).
+        """
+        last_id = decode_sync_token(since) if since else 0
+        unseen = MileageResult.objects.filter(user=user, id__gt=last_id, id__lt=result.id).exists()
+        return since if unseen else encode_sync_token(result.id)
+
+class MileageBatchView(APIView):
+    """
+    Week-by-week plans for a whole club in one request, streamed as NDJSON:
+    one line per athlete, in request order. Nothing is saved.
+    """
+    permission_classes = [IsAuthenticated]
 
-def stats_dashboard(request):
+    def post(self, request):
+        serializer = MileageBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        athletes = serializer.validated_data["athletes"]
+        logger.info(f"Batch mileage plans requested by user {request.user.id}: {len(athletes)} athletes")
+
+        def lines():
+            for index, plan in enumerate(plan_batches(athletes, settings.MILEAGE_BATCH_CHUNK_SIZE)):
+                yield json.dumps({"index": index, **plan}) + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
 
-    total_runners = Runner.objects.count()
-
-    top_runner = (
-        Vote.objects.values('runner__name')
-        .annotate(count=Count('id'))
-        .order_by('-count')
-        .first()
-    )
-    if top_runner:
-        most_voted_runner = top_runner['runner__name']
-        top_votes = top_runner['count']
-    else:
-        most_voted_runner = None
-        top_votes = 0
-
-    total_memes = Meme.objects.count()
-
-    memes_by_category = (
-        Meme.objects.values('category')
-        .annotate(count=Count('id'))
-        .order_by('-count')
-    )
-
-    if memes_by_category:
-        top_meme_category = memes_by_category[0]['category']
-        top_meme_count = memes_by_category[0]['count']
-    else:
-        top_meme_category = None
-        top_meme_count = 0
-
-    avg_mileage = MileageResult.objects.aggregate(
-        avg=Avg('desired_mileage')
-    )['avg']
-
-    return JsonResponse({
-        "total_runners": total_runners,
-        "most_voted_runner": most_voted_runner,
-        "top_votes": top_votes,
-
-        "total_memes": total_memes,
-        "memes_by_category": list(memes_by_category),
-        "top_meme_category": top_meme_category,
-        "top_meme_count": top_meme_count,
-
-        "average_desired_mileage": avg_mileage,
-    })
+
+def stats_dashboard(request):
+    return JsonResponse(get_stats())
 
 class StorySearchView(APIView):
     permission_classes = [IsAuthenticated] 
 
     def get(self, request):
-        query = request.GET.get("q", "")
+        query = request.GET.get("q", "").strip()
         
         if not query:
-            return Response({"results": []})
-
-        stories = Story.objects.filter(
-            Q(content__icontains=query)
-        ).order_by("-created_at")
-
-        serializer = StorySerializer(stories, many=True)
-        return Response({"results": serializer.data})
-
+            return Response({"next": None, "results": []})
+
+        paginator = KeysetPagination()
+        page_size = paginator.get_page_size(request)
+        offset = 0
+        if request.GET.get("cursor"):
+            offset = decode_page_token(request.GET["cursor"])
+            if offset is None:
+                raise NotFound("Invalid cursor")
+
+        max_results = getattr(settings, "STORY_SEARCH_MAX_RESULTS", 1000)
+        limit = min(page_size + 1, max(0, max_results - offset))
+        hits = get_search_engine().search(query, offset, limit)
+        has_next = len(hits) > page_size
+        hits = hits[:page_size]
+
+        stories = Story.objects.for_feed().in_bulk([story_id for story_id, _ in hits])
+        results = []
+        for story_id, snippet in hits:
+            if story_id in stories:
+                data = StorySerializer(stories[story_id]).data
+                data["snippet"] = highlight(snippet)
+                results.append(data)
+
+        next_link = None
+        if has_next:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "cursor", encode_page_token(offset + page_size)
+            )
+        return Response({"next": next_link, "results": results})
 
-def current_vote_results():
-    results = Vote.objects.values('runner').annotate(count=Count('id'))
-    return {item['runner']: item['count'] for item in results}
 
 def votes_sse_stream(request):
+    """
+    Live vote counts as server-sent events.
+
+    The first event (``event: snapshot``) carries every runner's count; each
+    following message carries only the runners whose counts changed. Events
+    have ids, so a client reconnecting with ``Last-Event-ID`` is replayed the
+    deltas it missed, or sent a new snapshot if it is too far behind.
+
+    Under ASGI (``backend/asgi.py``) the stream is an async generator, so an
+    idle connection costs a coroutine instead of a worker thread. Under WSGI
+    it falls back to a blocking generator.
+    """
+    lease = get_stream_slots().lease()
+    if lease is None:
+        logger.warning("Vote stream connection refused: stream limit reached")
+        response = JsonResponse({"error": "Too many open vote streams"}, status=503)
+        response["Retry-After"] = "30"
+        return response
+
+    tally = get_vote_tally()
+    heartbeat = getattr(settings, "VOTE_STREAM_HEARTBEAT_SECONDS", 15)
+    resume_from = tally.parse_event_id(request.headers.get("Last-Event-ID"))
 
     def event_stream():
-        last_data = None
-        while True:
-            data = current_vote_results()
-            payload = json.dumps(data)
-
-            if payload != last_data:
-                yield f"data: {payload}\n\n"
-                last_data = payload
-
-            time.sleep(1)  
-
-    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+        version = resume_from
+        try:
+            if version is None:
+                version, data = tally.snapshot()
+                yield snapshot_event(tally, version, data)
+            while True:
+                events = tally.events_since(version)
+                if events is None:
+                    version, data = tally.snapshot()
+                    yield snapshot_event(tally, version, data)
+                elif events:
+                    for version, payload in events:
+                        yield delta_event(tally, version, payload)
+                elif not tally.wait(version, heartbeat):
+                    yield ": keepalive\n\n"
+        finally:
+            lease.release()
+
+    async def async_event_stream():
+        version = resume_from
+        try:
+            if version is None:
+                version, data = await tally.snapshot_async()
+                yield snapshot_event(tally, version, data)
+            while True:
+                events = await tally.events_since_async(version)
+                if events is None:
+                    version, data = await tally.snapshot_async()
+                    yield snapshot_event(tally, version, data)
+                elif events:
+                    for version, payload in events:
+                        yield delta_event(tally, version, payload)
+                elif not await tally.wait_async(version, heartbeat):
+                    yield ": keepalive\n\n"
+        except asyncio.CancelledError:
+            logger.info("Vote stream client disconnected")
+            raise
+        finally:
+            lease.release()
+
+    stream = async_event_stream() if isinstance(request, ASGIRequest) else event_stream()
+    response = StreamingHttpResponse(lease.wrap(stream), content_type="text/event-stream")
     response["Cache-Control"] = "no-cache"
     response["X-Accel-Buffering"] = "no"
     return response
 
 class MileageHistoryView(APIView):
     permission_classes = [IsAuthenticated]
+    # ?sort= values; each is backed by an index on MileageResult.
+    orderings = {
+        "asc": ("desired_mileage", "id"),
+        "desc": ("-desired_mileage", "-id"),
+        None: ("-created_at", "-id"),
+    }
 
     def get(self, request):
         queryset = MileageResult.objects.filter(user=request.user)
 
+        if "since" in request.GET:
+            return self.sync(request, queryset)
+
         age_filter = request.GET.get("age")  
         if age_filter:
             queryset = queryset.filter(age=age_filter)
 
         sort = request.GET.get("sort")  
-        if sort == "asc":
-            queryset = queryset.order_by("desired_mileage")
-        elif sort == "desc":
-            queryset = queryset.order_by("-desired_mileage")
+        ordering = self.orderings.get(sort, self.orderings[None])
+
+        paginator = KeysetPagination(ordering)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = MileageResultSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def sync(self, request, queryset):
+        """
+        Entries created after the one a sync token points at, oldest first,
+        at most MILEAGE_HISTORY_MAX_ENTRIES at a time; "more" says whether to
+        ask again with the returned token. An empty ``since`` starts from the
+        beginning.
+        """
+        since = request.GET["since"]
+        last_id = decode_sync_token(since) if since else 0
+        if last_id is None:
+            raise ValidationError({"since": "Invalid sync token."})
+
+        limit = settings.MILEAGE_HISTORY_MAX_ENTRIES
+        entries = list(queryset.filter(id__gt=last_id).order_by("id")[:limit + 1])
+        more = len(entries) > limit
+        entries = entries[:limit]
+        if entries:
+            last_id = entries[-1].id
+
+        return Response({
+            "results": MileageResultSerializer(entries, many=True).data,
+            "sync_token": encode_sync_token(last_id),
+            "more": more,
+        })
+
+
+class UploadCreateView(APIView):
+    """Start a resumable upload; the file is then sent with PUTs to uploads/<id>/."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(user=request.user)
+        logger.info(f"Upload {session.id} started by user {request.user.id}: {session.size} bytes")
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class UploadChunkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        return Response(UploadSessionSerializer(session).data)
+
+    def put(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+
+        try:
+            offset = int(request.headers.get("Upload-Offset", request.GET.get("offset", "")))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            raise ValidationError("Upload-Offset and Content-Length must be integers.")
+
+        if offset != session.received:
+            raise Conflict(f"Expected offset {session.received}.")
+        if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE or offset + length > session.size:
+            raise PayloadTooLarge()
+
+        written = write_chunk(session, request.stream, offset, length) if length else 0
+
+        if offset == 0 and written and sniff_content_type(read_head(session)) != session.content_type:
+            discard(session)
+            raise UnsupportedMediaType(session.content_type, "File content does not match its content type.")
+
+        if not UploadSession.objects.filter(pk=session.pk, received=offset).update(received=offset + written):
+            raise Conflict("Another chunk was written at this offset.")
+        session.received = offset + written
+        return Response(UploadSessionSerializer(session).data)
+
+    def delete(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        discard(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class UploadFinalizeView(APIView):
+    """Verify a completed upload and attach it to a new Meme or Runner."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        serializer = UploadFinalizeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if session.received != session.size:
+            raise Conflict(f"Upload incomplete: {session.received} of {session.size} bytes received.")
+        if session.kind == "runner" and not data.get("name"):
+            raise ValidationError({"name": ["This field is required."]})
+
+        path = part_path(session)
+        if file_sha256(path) != data["sha256"].lower():
+            raise ValidationError({"sha256": ["Checksum does not match the uploaded file."]})
+        if sniff_content_type(read_head(session)) != session.content_type:
+            discard(session)
+            raise UnsupportedMediaType(session.content_type, "File content does not match its content type.")
+        if not is_valid_image(path):
+            discard(session)
+            raise ValidationError({"file": ["Upload is not a valid image."]})
+
+        with open(path, "rb") as f, transaction.atomic():
+            if session.kind == "meme":
+                instance = Meme(user=request.user, title=data["title"], category=data["category"])
+                output = MemeSerializer
+            else:
+                instance = Runner(name=data["name"], description=data["description"])
+                output = RunnerSerializer
+            instance.image.save(stored_filename(session), File(f), save=False)
+            instance.save()
+
+        discard(session)
+        logger.info(f"Upload {pk} finalized as {session.kind} {instance.pk}")
+        return Response(output(instance, context={"request": request}).data, status=status.HTTP_201_CREATED)
+
+
+def serve_media(request, path):
+    """
+    Serve a file from MEDIA_ROOT. With MEDIA_SENDFILE_BACKEND set, only the
+    headers are produced here and nginx (X-Accel-Redirect) or Apache
+    (X-Sendfile) sends the bytes. Otherwise FileResponse hands the open file
+    to the server's sendfile wrapper, with single Range requests answered
+    by 206 partial responses.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if path.startswith("tmp/") or not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+    # Whole seconds, as in Last-Modified, or If-Modified-Since never matches.
+    mtime = int(stat.st_mtime)
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is None:
+        backend = getattr(settings, "MEDIA_SENDFILE_BACKEND", None)
+        byte_range = parse_range(request.headers.get("Range"), stat.st_size)
+        if_range = request.headers.get("If-Range")
+        if if_range and if_range != etag:
+            byte_range = None
+
+        if backend == "nginx":
+            response = HttpResponse(content_type=content_type)
+            # A URI: nginx decodes it, so spaces, "?", "%" and non-ASCII names survive.
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        elif backend == "apache":
+            response = HttpResponse(content_type=content_type)
+            # mod_xsendfile unescapes the path (XSendFileUnescape, on by default).
+            response["X-Sendfile"] = quote(full_path)
+        elif byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range:
+            start, end = byte_range
+            f = open(full_path, "rb")
+            if end == stat.st_size - 1:
+                # Open-ended range: FileResponse still uses sendfile from the offset.
+                f.seek(start)
+                response = FileResponse(f, content_type=content_type, status=206)
+            else:
+                response = StreamingHttpResponse(iter_file_range(f, start, end), content_type=content_type, status=206)
+                response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
         else:
-            queryset = queryset.order_by("-created_at")  
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
 
-        serializer = MileageResultSerializer(queryset, many=True)
-        return Response(serializer.data)
+        response["Accept-Ranges"] = "bytes"
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(mtime)
+    response["Cache-Control"] = media_cache_control(path)
+    return response
 
 
 def index_page(request):
@@ -0,0 +1,99 @@
+import atexit
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from .caching import bump_model_versions
+from .models import Runner
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class VoteCountBuffer:
+    """
+    Accumulates Runner.vote_count deltas in memory and writes them in one
+    transaction every ``interval`` seconds (or sooner once ``max_pending``
+    votes are waiting), so a burst of votes costs one UPDATE per runner per
+    flush instead of one contended UPDATE per vote. Deltas still pending if
+    the process dies are recovered by ``manage.py reconcile_counts``.
+    """
+
+    def __init__(self, interval=1.0, max_pending=500):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._count = 0
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, runner_id, delta):
+        with self._lock:
+            self._pending[runner_id] += delta
+            self._count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="vote-count-flusher", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            if self._count >= self.max_pending:
+                self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._count = 0
+        pending = {runner_id: delta for runner_id, delta in pending.items() if delta}
+        if not pending:
+            return
+        try:
+            with transaction.atomic():
+                for runner_id, delta in sorted(pending.items()):
+                    Runner.objects.filter(pk=runner_id).update(vote_count=F('vote_count') + delta)
+        except Exception:
+            logger.error("Vote count flush failed; keeping deltas for the next attempt", exc_info=True)
+            with self._lock:
+                self._pending.update(pending)
+            return
+        bump_model_versions(Runner)
+        logger.info(f"Flushed vote counts for {len(pending)} runners")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_count_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = VoteCountBuffer(
+                    getattr(settings, "VOTE_COUNT_FLUSH_SECONDS", 1.0),
+                    getattr(settings, "VOTE_COUNT_FLUSH_MAX_PENDING", 500),
+                )
+    return _buffer
+
+
+def record_vote_count(runner_id, delta):
+    """
+    Apply a vote_count change: inside the current transaction by default, or
+    through the flush buffer after commit when VOTE_INGEST_MODE is "buffered".
+    """
+    if getattr(settings, "VOTE_INGEST_MODE", "direct") == "buffered":
+        transaction.on_commit(lambda: get_vote_count_buffer().add(runner_id, delta))
+    else:
+        Runner.objects.filter(pk=runner_id).update(vote_count=F('vote_count') + delta)
+        transaction.on_commit(lambda: bump_model_versions(Runner))
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count
+
+from .db_router import primary_reads
+from .models import Vote
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def current_vote_results():
+    # The tally applies every change published after this load, so it must
+    # not start from a replica that has yet to see some of them.
+    with primary_reads():
+        results = Vote.objects.values('runner').annotate(count=Count('id'))
+        return {item['runner']: item['count'] for item in results}
+
+
+class VoteTally:
+    """
+    Vote counts shared by every open stream in this process.
+
+    The counts are loaded from the database once and then kept current by
+    the changes published on the broker, so open streams never query Vote.
+    A resync every ``resync_interval`` seconds corrects any drift (e.g. votes
+    deleted outside the app) at a cost of one query per process.
+
+    Every change is numbered and its delta (``{runner_id: new_count}``) is
+    encoded once and kept in a ring buffer of ``replay_size`` events, from
+    which streams catch up and reconnecting clients resume. Event ids are
+    prefixed with a per-process epoch so an id issued by another process or
+    before a restart is never mistaken for a local one.
+    """
+
+    def __init__(self, resync_interval=60, replay_size=256):
+        self._cond = threading.Condition()
+        self._counts = None
+        self._loaded_at = 0.0
+        self._async_events = {}
+        self._events = deque(maxlen=replay_size)
+        self.resync_interval = resync_interval
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+
+    def _needs_load(self):
+        return self._counts is None or time.monotonic() - self._loaded_at > self.resync_interval
+
+    def _ensure_loaded(self):
+        if self._needs_load():
+            counts = current_vote_results()
+            if self._counts is not None:
+                delta = {
+                    runner_id: counts.get(runner_id, 0)
+                    for runner_id in counts.keys() | self._counts.keys()
+                    if counts.get(runner_id, 0) != self._counts.get(runner_id, 0)
+                }
+                if delta:
+                    self._changed(delta)
+            self._counts = counts
+            self._loaded_at = time.monotonic()
+
+    def _changed(self, delta):
+        # Called with the lock held. Async waiters get one wake-up per event
+        # loop rather than one per connection.
+        self.version += 1
+        self._events.append((self.version, json.dumps(delta)))
+        self._cond.notify_all()
+        events, self._async_events = self._async_events, {}
+        for loop, event in events.items():
+            loop.call_soon_threadsafe(event.set)
+
+    def apply(self, runner_id, delta):
+        with self._cond:
+            if self._counts is None:
+                # Nothing is streaming yet; the first reader loads fresh counts.
+                return
+            count = self._counts.get(runner_id, 0) + delta
+            if count > 0:
+                self._counts[runner_id] = count
+            else:
+                self._counts.pop(runner_id, None)
+            self._changed({runner_id: max(count, 0)})
+
+    def event_id(self, version):
+        return f"{self.epoch}-{version}"
+
+    def parse_event_id(self, value):
+        epoch, _, version = (value or "").partition("-")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def snapshot(self):
+        with self._cond:
+            self._ensure_loaded()
+            return self.version, dict(self._counts)
+
+    def events_since(self, version):
+        """
+        Return the encoded deltas after ``version``, or None when they are no
+        longer buffered and the caller needs a fresh snapshot.
+        """
+        with self._cond:
+            self._ensure_loaded()
+            return self._events_since(version)
+
+    def _events_since(self, version):
+        if version == self.version:
+            return []
+        if version > self.version or not self._events or self._events[0][0] > version + 1:
+            return None
+        return [event for event in self._events if event[0] > version]
+
+    def wait(self, version, timeout):
+        with self._cond:
+            return self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+
+    async def snapshot_async(self):
+        with self._cond:
+            if not self._needs_load():
+                return self.version, dict(self._counts)
+        return await sync_to_async(self.snapshot)()
+
+    async def events_since_async(self, version):
+        with self._cond:
+            if not self._needs_load():
+                return self._events_since(version)
+        return await sync_to_async(self.events_since)(version)
+
+    async def wait_async(self, version, timeout):
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self.version != version:
+                return True
+            event = self._async_events.get(loop)
+            if event is None:
+                event = self._async_events[loop] = asyncio.Event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+def snapshot_event(tally, version, counts):
+    return f"id: {tally.event_id(version)}\nevent: snapshot\ndata: {json.dumps(counts)}\n\n"
+
+
+def delta_event(tally, version, payload):
+    return f"id: {tally.event_id(version)}\ndata: {payload}\n\n"
+
+
+class StreamSlots:
+    """Caps the number of concurrently open streams in this process."""
+
+    def __init__(self, limit):
+        self._lock = threading.Lock()
+        self.limit = limit
+        self.active = 0
+
+    def acquire(self):
+        with self._lock:
+            if self.limit and self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+    def lease(self):
+        """A StreamLease holding one slot, or None when the cap is reached."""
+        return StreamLease(self) if self.acquire() else None
+
+
+class StreamLease:
+    """One acquired stream slot, released exactly once however the stream ends."""
+
+    def __init__(self, slots):
+        self._slots = slots
+        self._lock = threading.Lock()
+        self._released = False
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._slots.release()
+
+    def wrap(self, stream):
+        """
+        Wrap a (sync or async) generator for StreamingHttpResponse so the
+        slot is also released by response.close(). A generator that never
+        started (client gone before the first byte, HEAD, a middleware
+        replacing the response) never runs its own ``finally``.
+        """
+        if hasattr(stream, "__aiter__"):
+            return _AsyncLeasedStream(stream, self)
+        return _LeasedStream(stream, self)
+
+
+class _LeasedStream:
+    def __init__(self, stream, lease):
+        self._stream = stream
+        self._lease = lease
+
+    def __iter__(self):
+        return self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._lease.release()
+
+
+class _AsyncLeasedStream:
+    def __init__(self, stream, lease):
+        self._stream = stream
+        self._lease = lease
+
+    def __aiter__(self):
+        return self._stream
+
+    def close(self):
+        # A running async generator is cancelled by the ASGI handler and
+        # cleans up itself; this covers one that never started.
+        self._lease.release()
+
+
+class InProcessBroker:
+    """Delivers published vote changes to subscribers in the same process."""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, message):
+        for callback in self._subscribers:
+            callback(message)
+
+
+class RedisBroker:
+    """
+    Fans vote changes out to every process through a Redis channel.
+
+    Redis being unreachable never fails a vote: a change that cannot be
+    published, or that a listener misses while reconnecting, is picked up by
+    the tally's next resync.
+    """
+
+    max_reconnect_delay = 30
+
+    def __init__(self, url, channel):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+        self._channel = channel
+        self._subscribers = []
+        self._listener = None
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, name="vote-stream-listener", daemon=True)
+            self._listener.start()
+
+    def publish(self, message):
+        try:
+            self._redis.publish(self._channel, json.dumps(message))
+        except self._errors as e:
+            logger.error(f"Could not publish vote change {message!r}: {e}")
+
+    def _listen(self):
+        delay = 1
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self._channel)
+                delay = 1
+                for item in pubsub.listen():
+                    self._dispatch(item)
+            except self._errors as e:
+                logger.warning(f"Vote stream listener lost Redis ({e}); reconnecting in {delay} s")
+            finally:
+                pubsub.close()
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _dispatch(self, item):
+        try:
+            message = json.loads(item["data"])
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed vote stream message: {item!r}")
+            return
+        for callback in self._subscribers:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception(f"Vote stream subscriber failed on {message!r}")
+
+
+_tally = VoteTally(
+    getattr(settings, "VOTE_STREAM_RESYNC_SECONDS", 60),
+    getattr(settings, "VOTE_STREAM_REPLAY_EVENTS", 256),
+)
+_slots = StreamSlots(getattr(settings, "VOTE_STREAM_MAX_CONNECTIONS", 0))
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def _on_message(message):
+    _tally.apply(message["runner"], message["delta"])
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = getattr(settings, "VOTE_STREAM_REDIS_URL", None)
+                if url:
+                    broker = RedisBroker(url, getattr(settings, "VOTE_STREAM_CHANNEL", "votes"))
+                else:
+                    broker = InProcessBroker()
+                broker.subscribe(_on_message)
+                _broker = broker
+    return _broker
+
+
+def get_vote_tally():
+    get_broker()
+    return _tally
+
+
+def publish_vote_change(runner_id, delta):
+    get_broker().publish({"runner": runner_id, "delta": delta})
+
+
+def get_stream_slots():
+    return _slots
@@ -60,6 +60,7 @@ MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,14 +92,96 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# SQLite by default; DB_ENGINE=postgres switches to PostgreSQL configured from
+# the POSTGRES_* variables. Postgres connections are kept open for
+# DB_CONN_MAX_AGE seconds (checked before reuse) instead of reconnecting on
+# every request, and each statement is cancelled after
+# DB_STATEMENT_TIMEOUT_MS. Behind PgBouncer in transaction pooling mode, set
+# DB_CONN_MAX_AGE=0 and DB_DISABLE_SERVER_SIDE_CURSORS=1.
+
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("POSTGRES_DB", "backend"),
+            'USER': os.environ.get("POSTGRES_USER", "postgres"),
+            'PASSWORD': os.environ.get("POSTGRES_PASSWORD", ""),
+            'HOST': os.environ.get("POSTGRES_HOST", "localhost"),
+            'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+            'CONN_MAX_AGE': int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get("DB_DISABLE_SERVER_SIDE_CURSORS") == "1",
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+                'options': f"-c statement_timeout={int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 5000))}",
+                'application_name': os.environ.get("DB_APPLICATION_NAME", "backend"),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+            # A file rather than the in-memory default, so the threaded tests
+            # in api/tests.py get real locking between connections.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLITE_PROFILE=concurrent is for SQLite deployments with concurrent
+# writers: WAL lets readers run alongside the writer, writers wait up to
+# SQLITE_BUSY_TIMEOUT_MS for the lock instead of failing with "database is
+# locked", and transactions BEGIN IMMEDIATE so they take the write lock up
+# front rather than failing to upgrade a read lock half way through.
+# synchronous=NORMAL can lose the last commits on power loss (never corrupts).
+
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "default")
+
+if DB_ENGINE != "postgres" and SQLITE_PROFILE == "concurrent":
+    DATABASES['default']['OPTIONS'] = {
+        'init_command': (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))};"
+            f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))};"
+            f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))};"
+        ),
+        'transaction_mode': 'IMMEDIATE',
     }
+
+# Read replicas: DB_REPLICA_HOSTS (Postgres) or SQLITE_REPLICA_PATHS, comma
+# separated. Safe requests read from a random replica (api.db_router), except
+# for DB_REPLICA_STICKY_SECONDS after the same client wrote something.
+
+if DB_ENGINE == "postgres":
+    _replicas = [{'HOST': host} for host in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if host]
+else:
+    _replicas = [{'NAME': path} for path in os.environ.get("SQLITE_REPLICA_PATHS", "").split(",") if path]
+
+DATABASE_REPLICAS = []
+for _number, _replica in enumerate(_replicas, 1):
+    DATABASES[f"replica{_number}"] = {**DATABASES['default'], **_replica, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f"replica{_number}")
+
+# A second database for api.tests.ReplicaRoutingTests to use as a replica. It
+# only gets a connection (and a test database) when a test asks for it, and
+# nothing routes to it unless it is listed in DATABASE_REPLICAS.
+if DB_ENGINE == "postgres":
+    _replica_test_name = f"test_{DATABASES['default']['NAME']}_replica"
+else:
+    _replica_test_name = BASE_DIR / 'test_replica_db.sqlite3'
+DATABASES['replica_test'] = {
+    **DATABASES['default'],
+    'NAME': _replica_test_name,
+    'TEST': {'NAME': _replica_test_name},
 }
 
+DATABASE_ROUTERS = ["api.db_router.PrimaryReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,7 +202,7 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
      'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -134,6 +217,13 @@ REST_FRAMEWORK = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media delivery: "nginx" answers with X-Accel-Redirect to
+# MEDIA_ACCEL_REDIRECT_PREFIX (an `internal` location aliased to MEDIA_ROOT),
+# "apache" with X-Sendfile; unset streams the file from Django.
+MEDIA_SENDFILE_BACKEND = os.environ.get("MEDIA_SENDFILE_BACKEND")
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+MEDIA_CACHE_SECONDS = 86400
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 CORS_ALLOW_ALL_ORIGINS = True
@@ -153,6 +243,14 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# api.authentication.CachedJWTAuthentication keeps up to AUTH_TOKEN_CACHE_SIZE
+# verified access tokens, each for at most AUTH_TOKEN_CACHE_SECONDS, and
+# rechecks the user's is_staff/is_active in the database every
+# AUTH_USER_CACHE_SECONDS (the longest a demotion or deactivation can lag).
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", 10000))
+AUTH_TOKEN_CACHE_SECONDS = int(os.environ.get("AUTH_TOKEN_CACHE_SECONDS", 300))
+AUTH_USER_CACHE_SECONDS = int(os.environ.get("AUTH_USER_CACHE_SECONDS", 30))
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -164,6 +262,101 @@ STATICFILES_DIRS = [BASE_DIR / 'api' / 'static']
 LOGIN_URL = '/api/login/' 
 
 
+# Cache
+# Redis (django-redis) when REDIS_URL is set, otherwise a per-process locmem
+# cache. Cached API responses and ETags are invalidated by per-model change
+# counters (api.caching). With Redis every worker sees every bump, so they
+# need no TTL; with locmem a write only bumps the counters of the worker that
+# handled it, so entries and counters expire after RESPONSE_CACHE_TIMEOUT
+# seconds to bound how long other workers serve stale lists.
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "IGNORE_EXCEPTIONS": True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "api",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+RESPONSE_CACHE_TIMEOUT = None if REDIS_URL else int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 30))
+
+
+# Live vote stream (/api/vote/stream/)
+# Set VOTE_STREAM_REDIS_URL to share vote changes between processes; without
+# it changes are delivered in-process only.
+
+VOTE_STREAM_REDIS_URL = os.environ.get("VOTE_STREAM_REDIS_URL", REDIS_URL)
+VOTE_STREAM_CHANNEL = "votes"
+VOTE_STREAM_HEARTBEAT_SECONDS = 15
+VOTE_STREAM_MAX_CONNECTIONS = int(os.environ.get("VOTE_STREAM_MAX_CONNECTIONS", 5000))
+VOTE_STREAM_RESYNC_SECONDS = 60
+VOTE_STREAM_REPLAY_EVENTS = 256
+
+# "buffered" accumulates Runner.vote_count changes in memory and writes them
+# in batches every VOTE_COUNT_FLUSH_SECONDS, for high-traffic live events.
+VOTE_INGEST_MODE = os.environ.get("VOTE_INGEST_MODE", "direct")
+VOTE_COUNT_FLUSH_SECONDS = 1.0
+VOTE_COUNT_FLUSH_MAX_PENDING = 500
+
+
+# Story search (/api/stories/search/)
+# "auto" picks the Postgres tsvector index or the SQLite FTS5 table created by
+# migration 0023 and falls back to a substring scan; "scan", "sqlite-fts5" and
+# "postgres" force an engine.
+
+STORY_SEARCH_ENGINE = os.environ.get("STORY_SEARCH_ENGINE", "auto")
+STORY_SEARCH_RECENCY_DAYS = 30
+STORY_SEARCH_MAX_RESULTS = 1000
+
+
+# Meme and runner image variants
+# Generated after upload by a Celery worker when IMAGE_PIPELINE is "celery",
+# otherwise by a small thread pool in the web process.
+
+IMAGE_PIPELINE = os.environ.get("IMAGE_PIPELINE", "thread")
+IMAGE_PIPELINE_THREADS = 2
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ("avif", "webp", "jpeg")
+
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", REDIS_URL)
+CELERY_TASK_IGNORE_RESULT = True
+
+
+# Resumable chunked uploads (/api/uploads/)
+
+CHUNKED_UPLOAD_DIR = os.path.join(BASE_DIR, "tmp", "uploads")
+CHUNKED_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+CHUNKED_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+CHUNKED_UPLOAD_CONTENT_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+
+
+# Stats dashboard (/api/stats/) is served from a snapshot at most this old.
+
+STATS_MAX_AGE_SECONDS = int(os.environ.get("STATS_MAX_AGE_SECONDS", 60))
+
+# Batch mileage plans (/api/mileage/batch/) are computed this many athletes
+# at a time.
+MILEAGE_BATCH_CHUNK_SIZE = int(os.environ.get("MILEAGE_BATCH_CHUNK_SIZE", 1000))
+
+# Most mileage history entries returned by one sync (?since=) or by a POST
+# to /api/mileage/?include_history=1.
+MILEAGE_HISTORY_MAX_ENTRIES = int(os.environ.get("MILEAGE_HISTORY_MAX_ENTRIES", 100))
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
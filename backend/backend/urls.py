@@ -1,19 +1,18 @@
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from django.shortcuts import redirect
 
+from api.views import serve_media
+
 urlpatterns = [
     path('', lambda request: redirect('/api/login/', permanent=False)),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path("api/metrics/", include("django_prometheus.urls")), 
+    re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"), serve_media, name="media"),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
 
 
@@ -96,17 +96,38 @@ function authHeaders(json = true): HeadersObject {
     return headers;
 }
 
+// List endpoints are cursor-paginated; follow "next" until the last page.
+async function fetchAllPages<T>(url: string, headers: HeadersObject): Promise<{ res: Response; items: T[] }> {
+    const items: T[] = [];
+    let next: string | null = `${url}${url.includes("?") ? "&" : "?"}paginate=cursor&page_size=100`;
+    let res!: Response;
+    while (next) {
+        res = await fetch(next, { headers });
+        if (!res.ok) break;
+        const data: { next: string | null; results: T[] } = await res.json();
+        items.push(...data.results);
+        next = data.next;
+    }
+    return { res, items };
+}
+
 // -------------------- SSE (votes) --------------------
+// The stream opens with a full "snapshot" event; later messages carry only
+// the runners whose counts changed.
 const sse = new EventSource(`${apiUrl}/vote/stream/`);
-sse.onmessage = (e: MessageEvent) => {
+let voteMap: Record<number, number> = {};
+function applyVoteEvent(e: MessageEvent, replace: boolean): void {
     try {
-        const voteMap: Record<number, number> = JSON.parse(e.data);
+        const counts: Record<number, number> = JSON.parse(e.data);
+        voteMap = replace ? counts : { ...voteMap, ...counts };
         const runnerList = convertSSEToRunnerList(voteMap);
         loadResults(runnerList);
     } catch (err) {
         console.error("Invalid SSE data:", err);
     }
-};
+}
+sse.addEventListener("snapshot", (e: MessageEvent) => applyVoteEvent(e, true));
+sse.onmessage = (e: MessageEvent) => applyVoteEvent(e, false);
 
 // -------------------- DOM helpers (typed) --------------------
 const timelineContainer = document.querySelector<HTMLElement>('.timeline')!;
@@ -168,7 +189,7 @@ loadQuizRunners().then((data: QuizRunnerData) => {
 // upload input elements - typed when used
 
 // -------------------- State --------------------
-let memes: { id: number | string; url: string; category?: string }[] = [];
+let memes: { id: number | string; url: string; srcset?: string; category?: string }[] = [];
 let chosenValue = "all";
 let currentPage = 1;
 const memesPerPage = 10;
@@ -258,8 +279,7 @@ async function searchStories(): Promise<void> {
 // -------------------- Timeline references --------------------
 async function loadTimelineReferences(): Promise<void> {
     try {
-        const eventsRes = await fetch(`${apiUrl}/timeline/`, { headers: authHeaders() });
-        const events = await eventsRes.json();
+        const { items: events } = await fetchAllPages<any>(`${apiUrl}/timeline/`, authHeaders());
         const container = document.getElementById("timelineReferences");
         if (!container) return;
         container.innerHTML = "";
@@ -337,7 +357,7 @@ if (pollForm) {
             body: JSON.stringify({ runner: runnerId })
         });
 
-        if (response.status === 400) {
+        if (response.status === 409 || response.status === 400) {
             if (message) message.textContent = "You have already voted!";
             return;
         }
@@ -353,8 +373,7 @@ if (pollForm) {
 // -------------------- Load timeline --------------------
 async function loadTimeline(): Promise<void> {
     try {
-        const res = await fetch(`${apiUrl}/timeline/`, { headers: authHeaders() });
-        const events = await res.json();
+        const { items: events } = await fetchAllPages<any>(`${apiUrl}/timeline/`, authHeaders());
         if (!timelineContainer) return;
         timelineContainer.innerHTML = "";
 
@@ -492,6 +511,8 @@ if (addRunnerForm) {
 }
 
 // -------------------- Mileage form --------------------
+// what the history table shows; new plans are prepended instead of refetching it
+let mileageHistory: MileageRecord[] = [];
 if (btnMil) {
     btnMil.addEventListener("click", async function () {
         if (!mileageForm) return;
@@ -521,11 +542,12 @@ if (btnMil) {
                 return;
             }
 
-            const historyRes = await fetch(`${apiUrl}/mileage/history/`, { headers: { Authorization: `Bearer ${token}` } });
-            const historyData = await historyRes.json();
-            renderMileageTable(historyData);
-
             const latest = resData.latest;
+            if (latest) {
+                mileageHistory = [latest, ...mileageHistory];
+                renderMileageTable(mileageHistory);
+            }
+
             if (resultMileage && latest) {
                 resultMileage.innerHTML = `
                     <p>You will reach your desired ${latest.desired_mileage} miles in approximately 
@@ -543,11 +565,13 @@ if (btnMil) {
 // initial load for mileage history on window load
 window.addEventListener("load", async function () {
     try {
-        const res = await fetch(`${apiUrl}/mileage/history/`, { headers: { Authorization: `Bearer ${token}` } });
-        const data: MileageRecord[] = await res.json();
+        const { items: data } = await fetchAllPages<MileageRecord>(`${apiUrl}/mileage/history/`, {
+            Authorization: `Bearer ${token}`
+        });
         if (!data.length) return;
 
         const latest = data[0];
+        mileageHistory = data;
         renderMileageTable(data);
 
         if (resultMileage) {
@@ -569,11 +593,9 @@ async function fetchMileageHistory(): Promise<void> {
         if (ageFilter?.value) params.append("age", ageFilter.value);
         if (sortOrder?.value) params.append("sort", sortOrder.value);
 
-        const res = await fetch(`${apiUrl}/mileage/history/?${params.toString()}`, {
-            headers: { Authorization: `Bearer ${tokenLocal}` }
+        const { items: data } = await fetchAllPages<MileageRecord>(`${apiUrl}/mileage/history/?${params.toString()}`, {
+            Authorization: `Bearer ${tokenLocal}`
         });
-
-        const data = await res.json();
         renderMileageTable(data);
     } catch (err) {
         console.error("Failed to fetch mileage history:", err);
@@ -749,8 +771,8 @@ async function renderOrFetchStories(providedStories: Story[] | null): Promise<vo
     }
 
     try {
-        const res = await fetch(`${apiUrl}/stories/`, {
-            headers: { Authorization: `Bearer ${tokenLocal}` }
+        const { res, items: stories } = await fetchAllPages<Story>(`${apiUrl}/stories/`, {
+            Authorization: `Bearer ${tokenLocal}`
         });
 
         if (!res.ok) {
@@ -760,8 +782,6 @@ async function renderOrFetchStories(providedStories: Story[] | null): Promise<vo
             return;
         }
 
-        const data = await res.json();
-        const stories = Array.isArray(data) ? data as Story[] : (data.results || []) as Story[];
         renderStoriesArray(stories);
     } catch (err) {
         console.error("Error fetching stories:", err);
@@ -844,18 +864,17 @@ function loadMemesFromBackend(): void {
         return;
     }
 
-    fetch("http://127.0.0.1:8000/api/memes/", { headers: { Authorization: `Bearer ${tokenLocal}` } })
-        .then(res => {
+    fetchAllPages<any>("http://127.0.0.1:8000/api/memes/", { Authorization: `Bearer ${tokenLocal}` })
+        .then(({ res, items }) => {
             if (res.status === 401) {
                 localStorage.clear();
                 window.location.href = "/api/login/";
+                return;
             }
-            return res.json();
-        })
-        .then((data: any[]) => {
-            memes = data.map(meme => ({
+            memes = items.map(meme => ({
                 id: meme.id,
                 url: meme.image,
+                srcset: meme.srcset?.webp ?? "",
                 category: meme.category
             }));
             currentPage = 1;
@@ -903,7 +922,7 @@ function filterGallery(): void {
         galleryElement.classList.add("gallery-item");
         galleryElement.setAttribute("data-meme-id", String(m.id));
         galleryElement.innerHTML = `
-            <img src="${m.url}">
+            <img src="${m.url}" srcset="${m.srcset ?? ""}" sizes="(max-width: 600px) 100vw, 33vw" loading="lazy">
             ${isAdmin ? `<button class="delete-meme-btn" data-id="${m.id}">Delete</button>` : ""}
         `;
         galleryContainer.appendChild(galleryElement);